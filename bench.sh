@@ -0,0 +1,3 @@
+#!/bin/bash
+
+python3 -m bench.run "$@"
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# Benchmarks for the hot paths at several map sizes, with fixed seeds.
+#
+#   ./bench.sh                          # all sizes, compare to bench/baseline.json
+#   ./bench.sh --sizes small --out r.json
+#   ./bench.sh --save-baseline          # record the current numbers as baseline
+#
+# Re-record the baseline in the same commit as any change to the cases or
+# the code they time, so every case always has a baseline to compare to.
+#
+# Each case is timed `repeat` times over `number` calls; the JSON report
+# keeps the best and median time per call in microseconds. Comparisons use
+# the best time, which is the least noisy.
+
+import argparse
+import copy
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from src import render
+from src.balance import apply_overrides
+from src.dungeon.fov import compute_fov
+from src.dungeon.mapgen import bfs_distance
+from src.dungeon.pathfinding import astar, jps
+from src.game import Game
+from src.progress import DEFAULT_PROGRESS
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SEED = 1234
+THRESHOLD = 1.25  # a case this many times slower than baseline is a regression
+
+# Map size and entity counts per size; entities scale with the map area.
+SIZES = {
+    "small":  {"MAP_W": 60,  "MAP_H": 24,  "ROOM_ATTEMPTS": 30,  "MONSTER_COUNT": 12,
+               "COIN_COUNT": 20,  "POTION_COUNT": 4},
+    "medium": {"MAP_W": 160, "MAP_H": 60,  "ROOM_ATTEMPTS": 200, "MONSTER_COUNT": 80,
+               "COIN_COUNT": 130, "POTION_COUNT": 25},
+    "large":  {"MAP_W": 400, "MAP_H": 150, "ROOM_ATTEMPTS": 1200, "MONSTER_COUNT": 500,
+               "COIN_COUNT": 800, "POTION_COUNT": 160},
+}
+CALLS = {"small": 20, "medium": 4, "large": 1}  # base calls per sample
+TICKS = 200  # ticks per timed Game.tick() sample
+
+
+def _time(fn, number, repeat, setup=None):
+    """Per-call seconds of `fn` for each of `repeat` samples."""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def _new_game():
+    random.seed(SEED)
+    return Game(copy.deepcopy(DEFAULT_PROGRESS))
+
+
+def bench_size(size, repeat=5, number=None):
+    """Time every case on one map size; returns {case: [seconds per call]}."""
+    apply_overrides(SIZES[size])
+    n = number or CALLS[size]
+    out = io.StringIO()
+    results = {}
+
+    game = _new_game()
+    results["build_floor"] = _time(game._build_floor, n, repeat,
+                                   setup=lambda: random.seed(SEED))
+    game = _new_game()
+    grid, spawn = game.grid, (game.player.x, game.player.y)
+    results["bfs_distance"] = _time(lambda: bfs_distance(grid, spawn), n * 5, repeat)
+    results["astar"] = _time(lambda: astar(grid, spawn, [game.exit]), n * 5, repeat)
+    results["jps"] = _time(lambda: jps(grid, spawn, [game.exit]), n * 5, repeat)
+    # compute_fov itself: Game.compute_visibility() hits the floor's FOV cache
+    results["compute_visibility"] = _time(lambda: compute_fov(grid, spawn, 8), n * 20, repeat)
+
+    def full_frame():
+        render.reset_frame()
+        render.draw(game, out=out)
+        out.seek(0)
+        out.truncate()
+    results["draw_full"] = _time(full_frame, n * 2, repeat)
+
+    def diff_frame():
+        game.tick()
+        render.draw(game, out=out)
+        out.seek(0)
+        out.truncate()
+    render.reset_frame()
+    render.draw(game, out=out)
+    results["draw_tick"] = _time(diff_frame, n * 5, repeat)
+
+    state = {}
+
+    def fresh():
+        state["game"] = _new_game()
+
+    def ticks():
+        g = state["game"]
+        for _ in range(TICKS):
+            if g.is_over():
+                break
+            g.tick()
+    results["tick"] = [t / TICKS for t in _time(ticks, 1, repeat, setup=fresh)]
+    apply_overrides({})
+    return results
+
+
+def run_suite(sizes=None, repeat=5, number=None):
+    """Run the benchmarks; returns the JSON-ready report."""
+    report = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "platform": platform.platform(), "seed": SEED, "repeat": repeat,
+                 "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": {},
+    }
+    for size in sizes or SIZES:
+        for case, samples in bench_size(size, repeat, number).items():
+            report["results"][f"{size}/{case}"] = {
+                "best_us": round(min(samples) * 1e6, 2),
+                "median_us": round(statistics.median(samples) * 1e6, 2),
+            }
+    return report
+
+
+def compare(report, baseline, threshold=THRESHOLD):
+    """[(name, best_us, baseline_best_us or None, ratio or None, regressed)]"""
+    rows = []
+    base = baseline.get("results", {})
+    for name, r in report["results"].items():
+        b = base.get(name)
+        if b is None:
+            rows.append((name, r["best_us"], None, None, False))
+            continue
+        ratio = r["best_us"] / b["best_us"] if b["best_us"] else None
+        rows.append((name, r["best_us"], b["best_us"], ratio,
+                     ratio is not None and ratio > threshold))
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the hot paths.")
+    ap.add_argument("--sizes", default=",".join(SIZES),
+                    help=f"comma-separated subset of {', '.join(SIZES)}")
+    ap.add_argument("--repeat", type=int, default=5, help="samples per case")
+    ap.add_argument("--out", help="write the JSON report here")
+    ap.add_argument("--baseline", default=BASELINE, help="baseline report to compare against")
+    ap.add_argument("--save-baseline", action="store_true",
+                    help="write this run as the new baseline")
+    ap.add_argument("--threshold", type=float, default=THRESHOLD,
+                    help="slowdown ratio reported as a regression")
+    args = ap.parse_args(argv)
+
+    report = run_suite(args.sizes.split(","), repeat=args.repeat)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = 0
+    print(f"{'case':28} {'best µs':>12} {'baseline':>12} {'ratio':>7}")
+    for name, best, base, ratio, regressed in compare(report, baseline, args.threshold):
+        regressions += regressed
+        print(f"{name:28} {best:12.1f} {base if base is not None else '-':>12} "
+              f"{f'{ratio:.2f}' if ratio else '-':>7}{'  REGRESSION' if regressed else ''}")
+    if regressions:
+        print(f"\n{regressions} case(s) slower than {args.threshold}x baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# Monte Carlo balance runner — fan seeded headless runs out over a process
+# pool and aggregate the results per config point.
+#
+#   python -m src.balance --runs 2000 --set FLOOR_SCALING=0.8,1.0,1.2 \
+#       --set UPGRADE_COSTS.hp=15,20 --out sweep.jsonl
+
+import argparse
+import copy
+import importlib
+import itertools
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src import progress as prog
+from src.sim import simulate_run, MAX_TICKS
+from src.store import RunHistory
+
+# Modules whose globals hold tunables. Names imported with `from x import y`
+# are bound in several modules, so an override is applied to every one of them.
+TUNABLE_MODULES = ("src.config", "src.progress", "src.game", "src.combat",
+                   "src.dungeon.mapgen", "src.dungeon.chunks")
+PERCENTILES = (10, 25, 50, 75, 90)
+
+_defaults = {}
+
+
+def _modules():
+    return [importlib.import_module(m) for m in TUNABLE_MODULES]
+
+
+def apply_overrides(overrides):
+    """Reset every tunable to its default, then apply `overrides`.
+
+    Keys are global names (``FLOOR_SCALING``) or ``NAME.key`` for one entry
+    of a dict tunable (``UPGRADE_COSTS.hp``).
+    """
+    mods = _modules()
+    for mod in mods:
+        for name, value in _defaults.get(mod.__name__, {}).items():
+            setattr(mod, name, value)
+    copied = set()  # dict tunables already copied for this call's sub-keys
+    for key, value in overrides.items():
+        name, _, sub = key.partition(".")
+        owners = [m for m in mods if hasattr(m, name)]
+        if not owners:
+            raise KeyError(f"unknown tunable: {name}")
+        for mod in owners:
+            saved = _defaults.setdefault(mod.__name__, {})
+            saved.setdefault(name, getattr(mod, name))
+            if sub:
+                if (mod.__name__, name) not in copied:
+                    copied.add((mod.__name__, name))
+                    setattr(mod, name, copy.copy(saved[name]))
+                getattr(mod, name)[sub] = value
+            else:
+                setattr(mod, name, value)
+
+
+def _run_task(task):
+    overrides, seed, max_floors, max_ticks = task
+    apply_overrides(overrides)
+    return simulate_run(seed, max_floors=max_floors, max_ticks=max_ticks)
+
+
+def percentile(sorted_vals, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_vals:
+        return None
+    k = max(0, min(len(sorted_vals) - 1, round(pct / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+
+def summarize(runs):
+    """Aggregate simulate_run() results into percentiles and rates."""
+    depths = sorted(r["depth"] for r in runs)
+    gold_per_floor = sorted(f["gold"] for r in runs for f in r["floors"])
+    boss_floors = [f for r in runs for f in r["floors"] if f["boss_floor"]]
+    boss_deaths = sum(1 for f in boss_floors if f["result"] == "dead")
+    return {
+        "runs": len(runs),
+        "depth": {f"p{p}": percentile(depths, p) for p in PERCENTILES},
+        "gold_per_floor": {f"p{p}": percentile(gold_per_floor, p) for p in PERCENTILES},
+        "boss_floors": len(boss_floors),
+        "boss_floor_death_rate": boss_deaths / len(boss_floors) if boss_floors else 0.0,
+        "causes": dict(Counter(r["cause"] for r in runs if r["cause"])),
+    }
+
+
+def config_grid(settings):
+    """Expand {"NAME": [v1, v2], ...} into a list of override dicts."""
+    if not settings:
+        return [{}]
+    keys = list(settings)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(settings[k] for k in keys))]
+
+
+def check_grid(grid):
+    """Raise ValueError if a tunable is only set at points whose upgrade
+    policy never reads it (AUTO_SPEND_RATIO under "plan"): sweeping it
+    would silently change nothing."""
+    for name in sorted({k.partition(".")[0] for point in grid for k in point}):
+        readers = [p for p, names in prog.POLICY_TUNABLES.items() if name in names]
+        policies = {point.get("AUTO_UPGRADE_POLICY", prog.AUTO_UPGRADE_POLICY)
+                    for point in grid if any(k.partition(".")[0] == name for k in point)}
+        if readers and not policies & set(readers):
+            raise ValueError(
+                f"{name} is ignored by AUTO_UPGRADE_POLICY={', '.join(sorted(policies))}; "
+                f"also set AUTO_UPGRADE_POLICY='\"{readers[0]}\"' to sweep it")
+
+
+def run_batch(runs, seed=0, max_floors=None, max_ticks=MAX_TICKS, grid=None,
+              workers=None, on_result=None):
+    """Run `runs` seeded runs for every config point in `grid` (a list of
+    override dicts) across a process pool. Seeds are seed..seed+runs-1 for
+    every point, so points are compared on identical dungeons. Results stream
+    into `on_result(point_index, run)` as they complete; returns a list of
+    (overrides, summary) pairs in grid order. Raises ValueError for a grid
+    that sweeps a tunable its upgrade policy ignores (see check_grid)."""
+    grid = grid or [{}]
+    check_grid(grid)
+    results = [[] for _ in grid]
+    tasks = {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for i, overrides in enumerate(grid):
+            for s in range(seed, seed + runs):
+                fut = pool.submit(_run_task, (overrides, s, max_floors, max_ticks))
+                tasks[fut] = i
+        for fut in as_completed(tasks):
+            i = tasks[fut]
+            run = fut.result()
+            results[i].append(run)
+            if on_result:
+                on_result(i, run)
+    for runs_i in results:
+        runs_i.sort(key=lambda r: r["seed"])
+    return [(overrides, summarize(r)) for overrides, r in zip(grid, results)]
+
+
+def _parse_setting(text):
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=v1,v2,... got {text!r}")
+    return name, [json.loads(v) for v in values.split(",")]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Monte Carlo balance runner.")
+    ap.add_argument("--runs", type=int, default=200, help="seeded runs per config point")
+    ap.add_argument("--seed", type=int, default=0, help="first seed")
+    ap.add_argument("--floors", type=int, default=None, help="stop each run after N floors")
+    ap.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="per-floor tick limit")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    ap.add_argument("--set", dest="settings", action="append", type=_parse_setting, default=[],
+                    metavar="NAME=v1,v2", help="sweep a tunable, e.g. UPGRADE_COSTS.hp=15,20")
+    ap.add_argument("--out", help="append one JSON summary per config point to this file")
+    ap.add_argument("--history", metavar="DB", help="log every floor to this SQLite store")
+    args = ap.parse_args(argv)
+
+    grid = config_grid(dict(args.settings))
+    try:
+        check_grid(grid)
+    except ValueError as e:
+        ap.error(str(e))
+    total = len(grid) * args.runs
+    done = 0
+    start = time.perf_counter()
+    history = RunHistory(args.history) if args.history else None
+
+    def progress(_, run):
+        nonlocal done
+        done += 1
+        if history:
+            for floor in run["floors"]:
+                history.record(floor)
+        if done % 100 == 0 or done == total:
+            print(f"\r{done}/{total} runs", end="", flush=True)
+
+    summaries = run_batch(args.runs, seed=args.seed, max_floors=args.floors,
+                          max_ticks=args.max_ticks, grid=grid, workers=args.workers,
+                          on_result=progress)
+    if history:
+        history.close()
+    print(f"  ({time.perf_counter() - start:.1f}s)")
+
+    for overrides, summary in summaries:
+        label = ", ".join(f"{k}={v}" for k, v in overrides.items()) or "defaults"
+        d, g = summary["depth"], summary["gold_per_floor"]
+        print(f"\n[{label}]")
+        print("  depth  " + "  ".join(f"{k} {v}" for k, v in d.items()))
+        print("  gold/floor  " + "  ".join(f"{k} {v}" for k, v in g.items()))
+        print(f"  boss-floor death rate {summary['boss_floor_death_rate']:.1%} "
+              f"({summary['boss_floors']} boss floors)  causes {summary['causes']}")
+        if args.out:
+            with open(args.out, "a") as f:
+                f.write(json.dumps({"overrides": overrides, "seed": args.seed, **summary}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
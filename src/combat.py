@@ -0,0 +1,141 @@
+# Exact fight outcomes for Game's combat rules, without playing rounds.
+#
+# A fight is a sequence of ticks. Each tick the runner regenerates, hits the
+# monster for max(1, atk - df) (x1.5, rounded down, on a 10% crit), and the
+# monster, if still alive, hits back for max(1, atk - df). The monster's
+# damage is fixed, so the runner's HP before each exchange is a
+# deterministic sequence; only R, the round in which the monster dies, is
+# random. R has a closed form through the binomial number of crits, so the
+# runner wins iff R <= K, the round it would die in.
+
+import bisect
+import random
+from collections import namedtuple
+from functools import lru_cache
+from math import comb
+
+CRIT_CHANCE = 0.10
+CRIT_MULT = 1.5
+
+FightOdds = namedtuple("FightOdds", "win hp_lost rounds")
+
+
+def hit_damage(atk, df):
+    """(normal, critical) damage of one hit."""
+    dmg = max(1, atk - df)
+    return dmg, int(dmg * CRIT_MULT)
+
+
+def kill_round_cdf(m_hp, dmg, crit_dmg, crit=None):
+    """Tuple c where c[r-1] = P(the monster is dead after r hits)."""
+    return _kill_round_cdf(m_hp, dmg, crit_dmg, CRIT_CHANCE if crit is None else crit)
+
+
+@lru_cache(maxsize=4096)
+def _kill_round_cdf(m_hp, dmg, crit_dmg, crit):
+    rounds = -(-m_hp // dmg)  # without crits
+    cdf = []
+    for r in range(1, rounds + 1):
+        if crit_dmg > dmg:
+            # need n crits with n*crit_dmg + (r-n)*dmg >= m_hp
+            n_min = max(0, -(-(m_hp - r * dmg) // (crit_dmg - dmg)))
+        else:
+            n_min = 0 if r * dmg >= m_hp else r + 1
+        cdf.append(sum((comb(r, n) * crit**n * (1 - crit)**(r - n)
+                       for n in range(n_min, r + 1)), 0.0))
+    cdf[-1] = 1.0
+    return tuple(cdf)
+
+
+def hp_track(hp, max_hp, regen, frac, m_dmg, rounds, first_regen=True):
+    """Runner (hp, frac) after regen at the start of each round 1..rounds,
+    assuming the monster survives to hit back every earlier round. Stops
+    early at the round the runner dies in; returns (track, death_round or
+    None). Without `first_regen`, round 1 starts from (hp, frac) as given:
+    the runner has already regenerated this tick."""
+    track = []
+    for r in range(1, rounds + 1):
+        # same result as Player.tick_regen(): subtracting 1.0 n times is
+        # exact for frac < 2**53, so it equals subtracting n at once
+        if regen > 0 and hp < max_hp and (first_regen or r > 1):
+            frac += regen
+            if frac >= 1.0:
+                n = int(frac)
+                hp = min(max_hp, hp + n)
+                frac -= n
+        track.append((hp, frac))
+        hp -= m_dmg
+        if hp <= 0:
+            return track, r
+    return track, None
+
+
+def _setup(hp, max_hp, regen, frac, atk, df, m_hp, m_atk, m_df, crit, first_regen=True):
+    dmg, crit_dmg = hit_damage(atk, m_df)
+    m_dmg = max(1, m_atk - df)
+    cdf = _kill_round_cdf(m_hp, dmg, crit_dmg, crit)
+    track, death = hp_track(hp, max_hp, regen, frac, m_dmg, len(cdf), first_regen)
+    return cdf, track, death, m_dmg
+
+
+def outcome(hp, max_hp, regen, frac, atk, df, m_hp, m_atk, m_df, crit=None):
+    """Exact FightOdds(win probability, expected HP lost, expected rounds)
+    for a runner with these stats fighting a monster to the death. `crit`
+    defaults to CRIT_CHANCE as it is at the time of the call."""
+    return _outcome(hp, max_hp, regen, frac, atk, df, m_hp, m_atk, m_df,
+                    CRIT_CHANCE if crit is None else crit)
+
+
+@lru_cache(maxsize=65536)
+def _outcome(hp, max_hp, regen, frac, atk, df, m_hp, m_atk, m_df, crit):
+    cdf, track, death, m_dmg = _setup(hp, max_hp, regen, frac, atk, df,
+                                      m_hp, m_atk, m_df, crit)
+    win = cdf[death - 1] if death else 1.0
+    hp_lost = rounds = 0.0
+    prev = 0.0
+    for r, c in enumerate(cdf[:death] if death else cdf, start=1):
+        p = c - prev  # monster dies in round r
+        prev = c
+        hp_lost += p * (hp - track[r - 1][0])
+        rounds += p * r
+    if death:
+        hp_lost += (1 - win) * hp
+        rounds += (1 - win) * death
+    return FightOdds(win, hp_lost, rounds)
+
+
+def fight_odds(player, monster, crit=None):
+    """outcome() of `player` fighting `monster` from their current state."""
+    return outcome(player.hp, player.max_hp, player.regen, player._frac,
+                   player.atk, player.df, monster.hp, monster.atk, monster.df, crit)
+
+
+def resolve_fight(player, monster, rng=random, crit=None, first_regen=True):
+    """Play a whole fight in one step with the same outcome distribution as
+    round-by-round combat: the kill round is sampled from its exact
+    distribution with one draw. Updates both entities and returns the
+    number of rounds fought. Pass first_regen=False if the runner has
+    already regenerated this tick, as Game's has when it resolves a fight."""
+    if crit is None:
+        crit = CRIT_CHANCE
+    cdf, track, death, m_dmg = _setup(player.hp, player.max_hp, player.regen, player._frac,
+                                      player.atk, player.df, monster.hp, monster.atk,
+                                      monster.df, crit, first_regen)
+    r = bisect.bisect_right(cdf, rng.random()) + 1
+    if death is None or r <= death:
+        player.hp, player._frac = track[r - 1]
+        monster.hp = 0
+    else:
+        # Runner dies in round `death`; the monster took `death` hits that
+        # didn't kill it: n crits with n*crit_dmg + (death-n)*dmg < hp.
+        dmg, crit_dmg = hit_damage(player.atk, monster.df)
+        ok = [n for n in range(death + 1)
+              if n * crit_dmg + (death - n) * dmg < monster.hp]
+        weights = [comb(death, n) * crit**n * (1 - crit)**(death - n) for n in ok]
+        n = rng.choices(ok, weights)[0]
+        monster.hp -= n * crit_dmg + (death - n) * dmg
+        hp, player._frac = track[death - 1]
+        player.hp = hp - m_dmg
+        r = death
+    player.flash = monster.flash = 2
+    return r
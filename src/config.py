@@ -5,9 +5,21 @@ MONSTER_COUNT = 12
 COIN_COUNT = 20
 POTION_COUNT = 4
 FLOOR_SCALING = 1.0           # monster stat scaling per floor
+HPA_MIN_AREA = 5_000          # maps this big route long paths over the room graph
+PATH_SEARCH = "jps"           # tile-by-tile detour search: "jps" or "astar"
+# Chasing is opt-in (--chase N): unupgraded runners rarely survive it, see README
+CHASE_RADIUS = 0              # monsters this many steps from the runner chase it (0: none)
+CHASE_EVERY = 2               # chasers step once every this many ticks
+CHASE_STRIKE = 2              # the runner keeps this many steps from chasers it avoids
+LAZY_MAP_AREA = 100_000       # bigger maps are generated lazily, chunk by chunk
+CHUNK_SIZE = 40               # chunk edge on lazily generated maps
+EXIT_CHUNK_DISTANCE = 6       # chunks between spawn and exit on those maps
 
 TICK_SPEEDS = {
     "slow": 0.15,
     "normal": 0.08,
-    "fast": 0.03
-}
\ No newline at end of file
+    "fast": 0.03,
+    "max": 0.0                # uncapped: tick as fast as possible
+}
+
+SPEED_KEYS = {"1": "slow", "2": "normal", "3": "fast", "4": "max"}
@@ -0,0 +1,141 @@
+import random
+from src.config import CHUNK_SIZE
+from src.dungeon.grid import Grid
+from src.dungeon.mapgen import place_rooms, connect_rooms, carve_room, carve_corridor, room_center
+
+
+class LazyMap:
+    """A map far larger than the screen whose layout is carved lazily, in
+    square chunks.
+
+    Only generation is lazy, not storage: the tiles live in one flat Grid
+    of w*h bytes allocated up front (so pathfinding, FOV and rendering keep
+    indexing `cells` directly) in which ungenerated chunks are solid wall.
+    Each chunk's layout comes from its own RNG stream seeded by
+    (seed, chunk), so chunks can be generated in any order, or regenerated,
+    with the same result. Neighbouring chunks meet at a door whose position
+    is derived from the seed as well, so a chunk can be carved without
+    looking at its neighbours and every chunk ends up connected.
+    """
+
+    def __init__(self, w, h, seed, size=None, grid=None, generated=None):
+        self.seed = seed
+        self.size = size = size or CHUNK_SIZE
+        self.grid = grid or Grid(w, h)
+        # The last chunk in each direction absorbs the remainder
+        self.cw = max(1, w // size)
+        self.ch = max(1, h // size)
+        self.generated = bytearray(generated or self.cw * self.ch)
+        self.version = 0  # bumped whenever a chunk is carved
+
+    # ---- geometry ----
+
+    def chunk_of(self, x, y):
+        return (min(x // self.size, self.cw - 1), min(y // self.size, self.ch - 1))
+
+    def rect(self, cx, cy):
+        """(x0, y0, x1, y1) of a chunk, end-exclusive."""
+        s = self.size
+        x1 = self.grid.w if cx == self.cw - 1 else (cx + 1) * s
+        y1 = self.grid.h if cy == self.ch - 1 else (cy + 1) * s
+        return cx * s, cy * s, x1, y1
+
+    def is_generated(self, cx, cy):
+        return 0 <= cx < self.cw and 0 <= cy < self.ch and self.generated[cy * self.cw + cx]
+
+    def neighbors(self, cx, cy):
+        for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+            if 0 <= nx < self.cw and 0 <= ny < self.ch:
+                yield nx, ny
+
+    def door(self, a, b):
+        """Tile on chunk `a`'s side of its door to the adjacent chunk `b`."""
+        (ax, ay), (bx, by) = a, b
+        lo = min(a, b)  # the door belongs to the left/upper chunk's edge
+        x0, y0, x1, y1 = self.rect(*lo)
+        rng = random.Random(f"{self.seed}/door/{lo[0]},{lo[1]}/{'h' if ay == by else 'v'}")
+        if ay == by:  # side by side: the door is a row on the shared edge
+            y = rng.randrange(y0 + 1, y1 - 1)
+            return (x1 - 1 if ax < bx else x1, y)
+        x = rng.randrange(x0 + 1, x1 - 1)
+        return (x, y1 - 1 if ay < by else y1)
+
+    # ---- generation ----
+
+    def generate(self, cx, cy):
+        """Carve chunk (cx, cy) if it isn't yet. Returns its rooms in map
+        coordinates, or None if it was already generated."""
+        if self.generated[cy * self.cw + cx]:
+            return None
+        x0, y0, x1, y1 = self.rect(cx, cy)
+        local = Grid(x1 - x0, y1 - y0)
+        rng = random.Random(f"{self.seed}/{cx},{cy}")
+        rooms = place_rooms(local, rng)
+        if not rooms:
+            rooms = [(2, 2, 6, 4)]
+            carve_room(local, *rooms[0])
+        connect_rooms(local, rooms)
+        for nb in self.neighbors(cx, cy):
+            dx, dy = self.door((cx, cy), nb)
+            dx, dy = dx - x0, dy - y0
+            rx, ry = min((room_center(r) for r in rooms),
+                         key=lambda c: abs(c[0] - dx) + abs(c[1] - dy))
+            if nb[1] == cy:  # left/right door: run along the door's row first
+                carve_corridor(local, dx, dy, rx, ry)
+            else:            # top/bottom door: come in along its column
+                carve_corridor(local, rx, ry, dx, dy)
+        w, cells, lw = self.grid.w, self.grid.cells, local.w
+        for j in range(y1 - y0):
+            cells[(y0 + j) * w + x0:(y0 + j) * w + x1] = local.cells[j * lw:(j + 1) * lw]
+        self.generated[cy * self.cw + cx] = 1
+        self.version += 1
+        return [(x + x0, y + y0, rw, rh) for (x, y, rw, rh) in rooms]
+
+    def ensure(self, x, y, radius=1):
+        """Generate every chunk within `radius` chunks of tile (x, y);
+        returns [(cx, cy, rooms)] for the ones carved just now."""
+        cx, cy = self.chunk_of(x, y)
+        new = []
+        for ny in range(max(0, cy - radius), min(self.ch, cy + radius + 1)):
+            for nx in range(max(0, cx - radius), min(self.cw, cx + radius + 1)):
+                rooms = self.generate(nx, ny)
+                if rooms is not None:
+                    new.append((nx, ny, rooms))
+        return new
+
+    # ---- navigation across chunks ----
+
+    def linked(self, start, goal):
+        """True if generated chunks connect chunk `start` to chunk `goal`."""
+        if not (self.is_generated(*start) and self.is_generated(*goal)):
+            return False
+        seen, stack = {start}, [start]
+        while stack:
+            c = stack.pop()
+            if c == goal:
+                return True
+            for nb in self.neighbors(*c):
+                if nb not in seen and self.is_generated(*nb):
+                    seen.add(nb)
+                    stack.append(nb)
+        return False
+
+    def frontier(self, start, goal):
+        """Door tiles leading out of the generated area around chunk `start`
+        into ungenerated chunks nearest to chunk `goal`, sorted."""
+        best, doors = None, []
+        seen, stack = {start}, [start]
+        while stack:
+            c = stack.pop()
+            for nb in self.neighbors(*c):
+                if self.is_generated(*nb):
+                    if nb not in seen:
+                        seen.add(nb)
+                        stack.append(nb)
+                    continue
+                d = abs(nb[0] - goal[0]) + abs(nb[1] - goal[1])
+                if best is None or d < best:
+                    best, doors = d, []
+                if d == best:
+                    doors.append(self.door(c, nb))
+        return sorted(set(doors))
@@ -1,6 +1,8 @@
-
+from array import array
 
 class Entity:
+    __slots__ = ("x", "y", "hp", "max_hp", "atk", "df", "flash")
+
     def __init__(self, x, y, hp, atk, df):
         self.x, self.y = x, y
         self.hp = hp
@@ -13,6 +15,8 @@ class Entity:
         return self.hp > 0
 
 class Player(Entity):
+    __slots__ = ("regen", "gold", "kills", "_frac")
+
     def __init__(self, x, y, max_hp, atk, df, regen):
         super().__init__(x, y, max_hp, atk, df)
         self.max_hp = max_hp
@@ -20,19 +24,111 @@ class Player(Entity):
         self.regen = regen
         self.gold = 0
         self.kills = 0
+        self._frac = 0.0
 
     def tick_regen(self):
         if self.regen > 0 and self.hp < self.max_hp:
-            self._frac = getattr(self, "_frac", 0.0)
             self._frac += self.regen
             while self._frac >= 1.0:
                 self.hp = min(self.max_hp, self.hp + 1)
                 self._frac -= 1.0
 
 class Monster(Entity):
-    pass
+    __slots__ = ("is_boss",)
+
+    def __init__(self, x, y, hp, atk, df, is_boss=False):
+        super().__init__(x, y, hp, atk, df)
+        self.is_boss = is_boss
 
 class Boss(Monster):
+    __slots__ = ()
+
     def __init__(self, x, y, hp, atk, df):
-        super().__init__(x, y, hp, atk, df)
-        self.is_boss = True
+        super().__init__(x, y, hp, atk, df, is_boss=True)
+
+
+# ----------------------- struct-of-arrays monsters -----------------------
+
+ALIVE, BOSS = 1, 2          # MonsterTable.flags bits
+_DECAY = bytes([0] + list(range(255)))  # flash n -> n-1, 0 stays 0
+
+class MonsterTable:
+    """Monsters stored column-wise: one array per stat, one row per monster.
+
+    Bulk per-tick work runs over whole columns (decay_flash() is a single
+    bytearray.translate), and a monster costs a few bytes per column
+    instead of a full object. Rows of dead monsters are recycled.
+    """
+
+    def __init__(self):
+        self.x = array("i")
+        self.y = array("i")
+        self.hp = array("i")
+        self.max_hp = array("i")
+        self.atk = array("i")
+        self.df = array("i")
+        self.flash = bytearray()
+        self.flags = bytearray()
+        self._free = []
+
+    def spawn(self, x, y, hp, atk, df, is_boss=False):
+        """Add a monster and return a MonsterRef to it."""
+        flags = ALIVE | (BOSS if is_boss else 0)
+        if self._free:
+            i = self._free.pop()
+            self.x[i], self.y[i], self.hp[i], self.max_hp[i] = x, y, hp, hp
+            self.atk[i], self.df[i], self.flash[i], self.flags[i] = atk, df, 0, flags
+        else:
+            i = len(self.flags)
+            for col, v in ((self.x, x), (self.y, y), (self.hp, hp), (self.max_hp, hp),
+                           (self.atk, atk), (self.df, df)):
+                col.append(v)
+            self.flash.append(0)
+            self.flags.append(flags)
+        return MonsterRef(self, i)
+
+    def release(self, ref):
+        """Free a monster's row for reuse; `ref` must not be used afterwards."""
+        self.flags[ref.i] = 0
+        self.flash[ref.i] = 0
+        self._free.append(ref.i)
+
+    def decay_flash(self):
+        self.flash = self.flash.translate(_DECAY)
+
+    def __len__(self):
+        return len(self.flags) - len(self._free)
+
+
+def _column(name):
+    return property(lambda ref: getattr(ref.table, name)[ref.i],
+                    lambda ref, v: getattr(ref.table, name).__setitem__(ref.i, v))
+
+class MonsterRef:
+    """Monster-compatible view of one MonsterTable row."""
+    __slots__ = ("table", "i")
+
+    def __init__(self, table, i):
+        self.table, self.i = table, i
+
+    x = _column("x")
+    y = _column("y")
+    hp = _column("hp")
+    max_hp = _column("max_hp")
+    atk = _column("atk")
+    df = _column("df")
+    flash = _column("flash")
+
+    @property
+    def is_boss(self):
+        return bool(self.table.flags[self.i] & BOSS)
+
+    @is_boss.setter
+    def is_boss(self, value):
+        if value:
+            self.table.flags[self.i] |= BOSS
+        else:
+            self.table.flags[self.i] &= ~BOSS
+
+    def is_alive(self):
+        return self.hp > 0
@@ -0,0 +1,54 @@
+from src.dungeon.grid import as_grid, WALL_CODE
+
+# Quadrant transforms: (origin, depth, col) -> tile. Each quadrant scans rows
+# at increasing depth away from the origin, columns spanning slopes -1..1.
+_QUADRANTS = (
+    lambda ox, oy, d, c: (ox + c, oy - d),  # north
+    lambda ox, oy, d, c: (ox + d, oy + c),  # east
+    lambda ox, oy, d, c: (ox + c, oy + d),  # south
+    lambda ox, oy, d, c: (ox - d, oy + c),  # west
+)
+
+
+def compute_fov(grid, origin, radius):
+    """Return the set of tiles visible from `origin` within `radius`.
+
+    Symmetric recursive shadowcasting: each row of each quadrant is scanned
+    once between a start and end slope, and walls narrow the slopes passed
+    to the next row, so every tile in range is visited once instead of
+    casting a ray per tile. Slopes are kept as exact integer fractions
+    (num, den) with den > 0. Walls are visible, tiles off the map block
+    sight, and the result is symmetric: if A sees B, B sees A.
+    """
+    grid = as_grid(grid)
+    w, h, cells = grid.w, grid.h, grid.cells
+    ox, oy = origin
+    r2 = radius * radius
+    visible = {origin}
+
+    for transform in _QUADRANTS:
+        def scan(depth, sn, sd, en, ed):
+            if depth > radius:
+                return
+            # round_ties_up(depth * start) .. round_ties_down(depth * end)
+            min_col = (2 * depth * sn + sd) // (2 * sd)
+            max_col = -((ed - 2 * depth * en) // (2 * ed))
+            prev_wall = None
+            for col in range(min_col, max_col + 1):
+                x, y = transform(ox, oy, depth, col)
+                inside = 0 <= x < w and 0 <= y < h
+                wall = not inside or cells[y * w + x] == WALL_CODE
+                if inside and col * col + depth * depth <= r2:
+                    symmetric = col * sd >= depth * sn and col * ed <= depth * en
+                    if wall or symmetric:
+                        visible.add((x, y))
+                if prev_wall and not wall:
+                    sn, sd = 2 * col - 1, 2 * depth
+                if prev_wall is False and wall:
+                    scan(depth + 1, sn, sd, 2 * col - 1, 2 * depth)
+                prev_wall = wall
+            if prev_wall is False:
+                scan(depth + 1, sn, sd, en, ed)
+
+        scan(1, -1, 1, 1, 1)
+    return visible
@@ -0,0 +1,81 @@
+from src.dungeon.constants import WALL, FLOOR
+
+WALL_CODE = ord(WALL)
+FLOOR_CODE = ord(FLOOR)
+
+
+class Grid:
+    """Flat byte-per-tile map: tile (x, y) lives at cells[y*w + x].
+
+    Hot loops (pathfinding, FOV, rendering) index `cells` directly with
+    flat indices; neighbors of index i are i±1 and i±w. `grid[y][x]` and
+    `len(grid)` / `len(grid[0])` keep working for code and tests written
+    against the old list-of-lists map.
+    """
+    __slots__ = ("w", "h", "cells")
+
+    def __init__(self, w, h, fill=WALL):
+        self.w, self.h = w, h
+        self.cells = bytearray(fill.encode()) * (w * h)
+
+    @classmethod
+    def from_rows(cls, rows):
+        g = cls(len(rows[0]), len(rows))
+        g.cells = bytearray("".join("".join(r) for r in rows).encode())
+        return g
+
+    def get(self, x, y):
+        return chr(self.cells[y * self.w + x])
+
+    def set(self, x, y, ch):
+        self.cells[y * self.w + x] = ord(ch)
+
+    def row(self, y):
+        """Row y as a str (one char per tile)."""
+        return self.cells[y * self.w:(y + 1) * self.w].decode()
+
+    def copy(self):
+        g = Grid(self.w, self.h)
+        g.cells = bytearray(self.cells)
+        return g
+
+    # ---- list-of-lists compatibility: grid[y][x], len(grid), iteration ----
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.h:
+            raise IndexError(y)
+        return _Row(self, y)
+
+    def __len__(self):
+        return self.h
+
+    def __iter__(self):
+        return (_Row(self, y) for y in range(self.h))
+
+
+class _Row:
+    __slots__ = ("grid", "y")
+
+    def __init__(self, grid, y):
+        self.grid, self.y = grid, y
+
+    def __getitem__(self, x):
+        if not 0 <= x < self.grid.w:
+            raise IndexError(x)
+        return chr(self.grid.cells[self.y * self.grid.w + x])
+
+    def __setitem__(self, x, ch):
+        if not 0 <= x < self.grid.w:
+            raise IndexError(x)
+        self.grid.cells[self.y * self.grid.w + x] = ord(ch)
+
+    def __len__(self):
+        return self.grid.w
+
+    def __iter__(self):
+        return iter(self.grid.row(self.y))
+
+
+def as_grid(grid):
+    """Return `grid` as a Grid, converting an old-style list of lists."""
+    return grid if isinstance(grid, Grid) else Grid.from_rows(grid)
@@ -1,35 +1,46 @@
 import random
 from collections import deque
+from array import array
 from src.config import ROOM_MIN, ROOM_MAX, ROOM_ATTEMPTS
-from src.dungeon.pathfinding import neighbors4
-from src.dungeon.constants import WALL, FLOOR
+from src.dungeon.constants import WALL
+from src.dungeon.grid import Grid, WALL_CODE, FLOOR_CODE
+from src.dungeon.spatial import SpatialIndex
 
 def make_empty_map(w, h):
-    return [[WALL for _ in range(w)] for _ in range(h)]
+    return Grid(w, h, WALL)
 
 def carve_room(grid, x, y, rw, rh):
-    for j in range(y, y+rh):
-        for i in range(x, x+rw):
-            if 0 <= i < len(grid[0]) and 0 <= j < len(grid):
-                grid[j][i] = FLOOR
+    w, cells = grid.w, grid.cells
+    x0, x1 = max(0, x), min(w, x + rw)
+    if x0 >= x1:
+        return
+    run = bytes([FLOOR_CODE]) * (x1 - x0)
+    for j in range(max(0, y), min(grid.h, y + rh)):
+        cells[j*w + x0:j*w + x1] = run
 
-def place_rooms(grid):
+def place_rooms(grid, rng=random):
+    """Try ROOM_ATTEMPTS random rooms, keeping those that don't touch an
+    accepted room. RNG stream: per attempt rng.randint() is drawn for width,
+    height, x, y in that order, whether or not the room is kept."""
+    w = grid.w
+    # Accepted rooms are marked in an occupancy mask; a candidate overlaps
+    # (or touches) one iff its rect plus a 1-tile margin hits a marked cell,
+    # which bytearray.find() checks one row at a time.
+    occupied = bytearray(len(grid.cells))
     rooms = []
     for _ in range(ROOM_ATTEMPTS):
-        rw = random.randint(ROOM_MIN, ROOM_MAX)
-        rh = random.randint(ROOM_MIN, ROOM_MAX)
-        x = random.randint(1, len(grid[0]) - rw - 2)
-        y = random.randint(1, len(grid) - rh - 2)
+        rw = rng.randint(ROOM_MIN, ROOM_MAX)
+        rh = rng.randint(ROOM_MIN, ROOM_MAX)
+        x = rng.randint(1, grid.w - rw - 2)
+        y = rng.randint(1, grid.h - rh - 2)
         # Check overlap
-        ok = True
-        for (rx, ry, rw2, rh2) in rooms:
-            if (x < rx+rw2+1 and x+rw+1 > rx and
-                y < ry+rh2+1 and y+rh+1 > ry):
-                ok = False
-                break
-        if ok:
-            carve_room(grid, x, y, rw, rh)
-            rooms.append((x, y, rw, rh))
+        if any(occupied.find(1, j*w + x, j*w + x + rw + 1) >= 0
+               for j in range(y, y + rh + 1)):
+            continue
+        carve_room(grid, x, y, rw, rh)
+        for j in range(y, y + rh + 1):
+            occupied[j*w + x:j*w + x + rw + 1] = b"\x01" * (rw + 1)
+        rooms.append((x, y, rw, rh))
     return rooms
 
 def room_center(room):
@@ -38,44 +49,78 @@ def room_center(room):
 
 def carve_corridor(grid, ax, ay, bx, by):
     # Simple L-shaped corridor
-    cx, cy = ax, ay
-    dx = 1 if bx > ax else -1
-    while cx != bx:
-        grid[cy][cx] = FLOOR
-        cx += dx
-    dy = 1 if by > ay else -1
-    while cy != by:
-        grid[cy][cx] = FLOOR
-        cy += dy
-    grid[by][bx] = FLOOR
+    w, cells = grid.w, grid.cells
+    lo, hi = min(ax, bx), max(ax, bx)
+    cells[ay*w + lo:ay*w + hi + 1] = bytes([FLOOR_CODE]) * (hi - lo + 1)
+    for y in range(min(ay, by), max(ay, by) + 1):
+        cells[y*w + bx] = FLOOR_CODE
 
 def connect_rooms(grid, rooms):
     if not rooms:
         return
     centers = [room_center(r) for r in rooms]
-    # Connect each room to the nearest previous room (simple heuristic)
-    connected = [centers[0]]
-    for c in centers[1:]:
-        nearest = min(connected, key=lambda k: abs(k[0]-c[0]) + abs(k[1]-c[1]))
-        carve_corridor(grid, c[0], c[1], nearest[0], nearest[1])
-        connected.append(c)
+    # Connect each room to the nearest previous room (simple heuristic),
+    # the earliest of equally near ones. Previous centers are kept in a
+    # SpatialIndex (value: room number), so a lookup only scans the
+    # buckets around the room rather than every previous room.
+    connected = SpatialIndex({centers[0]: 0}, cell=2 * ROOM_MAX)
+    for k, (cx, cy) in enumerate(centers[1:], 1):
+        (nx, ny), = connected.nearest((cx, cy))
+        d = abs(nx - cx) + abs(ny - cy)
+        ties = [p for p, _ in connected.in_rect(cx - d, cy - d, cx + d + 1, cy + d + 1)
+                if abs(p[0] - cx) + abs(p[1] - cy) == d]
+        nx, ny = min(ties, key=connected.__getitem__)
+        carve_corridor(grid, cx, cy, nx, ny)
+        if (cx, cy) not in connected:
+            connected[(cx, cy)] = k
+
+def generate_floor(w, h, rng=random):
+    """Carve a complete floor layout; returns (grid, rooms).
+
+    Draws from `rng` only in place_rooms(), so seeding `rng` reproduces the
+    layout exactly."""
+    grid = make_empty_map(w, h)
+    rooms = place_rooms(grid, rng)
+    if not rooms:
+        # ensure at least one room
+        carve_room(grid, 2, 2, 8, 6)
+        rooms = [(2, 2, 8, 6)]
+    connect_rooms(grid, rooms)
+    return grid, rooms
+
+def generate_floors(count, seed, w, h):
+    """Generate `count` layouts from one seed.
+
+    Layout k is generate_floor(w, h, random.Random(f"{seed}/{k}")): each
+    floor has its own documented stream, so any single floor of a batch can
+    be regenerated on its own.
+    """
+    return [generate_floor(w, h, random.Random(f"{seed}/{k}")) for k in range(count)]
 
 def all_floor_positions(grid):
+    w, cells = grid.w, grid.cells
     pos = []
-    for y in range(len(grid)):
-        for x in range(len(grid[0])):
-            if grid[y][x] == FLOOR:
-                pos.append((x, y))
+    i = cells.find(FLOOR_CODE)
+    while i >= 0:
+        pos.append((i % w, i // w))
+        i = cells.find(FLOOR_CODE, i + 1)
     return pos
 
 def bfs_distance(grid, start):
-    w, h = len(grid[0]), len(grid)
-    dist = {start: 0}
-    q = deque([start])
+    """Steps from `start` to every tile as a flat array (index y*w+x, -1 if
+    unreachable)."""
+    w, cells = grid.w, grid.cells
+    n, wm1 = len(cells), w - 1
+    dist = array("i", [-1]) * n
+    s = start[1]*w + start[0]
+    dist[s] = 0
+    q = deque([s])
     while q:
-        x, y = q.popleft()
-        for nx, ny in neighbors4(x, y, w, h):
-            if grid[ny][nx] != WALL and (nx, ny) not in dist:
-                dist[(nx, ny)] = dist[(x, y)] + 1
-                q.append((nx, ny))
-    return dist
\ No newline at end of file
+        i = q.popleft()
+        d = dist[i] + 1
+        x = i % w
+        for j in (i+1 if x < wm1 else -1, i-1 if x else -1, i+w, i-w):
+            if 0 <= j < n and dist[j] < 0 and cells[j] != WALL_CODE:
+                dist[j] = d
+                q.append(j)
+    return dist
@@ -0,0 +1,205 @@
+from array import array
+from heapq import heappop, heappush
+from src.dungeon.grid import as_grid, WALL_CODE
+
+# bytes.translate table: 1 for every passable tile code, 0 for walls
+_PASSABLE = bytes(0 if c == WALL_CODE else 1 for c in range(256))
+
+
+class NavGraph:
+    """Abstract navigation layer for HPA*-style planning, built once per floor.
+
+    The floor is split into regions: each room (an open rectangle) and each
+    connected piece of corridor outside the rooms. Portals are the pairs of
+    adjacent tiles in different regions. The graph's nodes are portal tiles,
+    with a step of 1 across each portal pair and the exact walking distance
+    between portals of the same region (Manhattan inside a room, BFS inside
+    a corridor piece). A query links its start and goals to the portals of
+    their regions, searches that graph with A*, then refines each hop into
+    tiles. Shortest paths come out exactly as long as a tile-by-tile
+    search would find, but the search visits portals, not tiles.
+    """
+
+    def __init__(self, grid, rooms):
+        grid = as_grid(grid)
+        self.grid = grid
+        w, h, cells = grid.w, grid.h, grid.cells
+        n, wm1 = len(cells), w - 1
+        self.rooms = []
+        region = array("i", [-1]) * n
+        passable = bytearray(cells.translate(_PASSABLE))
+        for k, (x, y, rw, rh) in enumerate(rooms):
+            x0, x1, y0, y1 = max(0, x), min(w, x + rw), max(0, y), min(h, y + rh)
+            self.rooms.append((x0, y0, x1, y1))
+            run, gap = array("i", [k]) * (x1 - x0), bytes(x1 - x0)
+            for j in range(y0, y1):
+                region[j*w + x0:j*w + x1] = run
+                passable[j*w + x0:j*w + x1] = gap
+
+        # Corridor pieces: flood fill whatever passable tiles the rooms left
+        self.corridors = []
+        i = passable.find(1)
+        while i >= 0:
+            rid = len(self.rooms) + len(self.corridors)
+            tiles = [i]
+            region[i], passable[i] = rid, 0
+            for t in tiles:
+                x = t % w
+                for j in (t+1 if x < wm1 else -1, t-1 if x else -1, t+w, t-w):
+                    if 0 <= j < n and passable[j]:
+                        region[j], passable[j] = rid, 0
+                        tiles.append(j)
+            self.corridors.append(tiles)
+            i = passable.find(1, i + 1)
+        self.region = region
+
+        # Portals, found along the outside of every room's rectangle
+        self.adj = {}
+        self.portals = [[] for _ in range(len(self.rooms) + len(self.corridors))]
+        for k, (x0, y0, x1, y1) in enumerate(self.rooms):
+            border = [(x, y0, x, y0 - 1) for x in range(x0, x1)]
+            border += [(x, y1 - 1, x, y1) for x in range(x0, x1)]
+            border += [(x0, y, x0 - 1, y) for y in range(y0, y1)]
+            border += [(x1 - 1, y, x1, y) for y in range(y0, y1)]
+            for ax, ay, bx, by in border:
+                if 0 <= bx < w and 0 <= by < h and region[by*w + bx] >= 0:
+                    self._link(ay*w + ax, by*w + bx)
+
+        # Exact distances between the portals of each region
+        self._corridor_dist = {}
+        for rid, ps in enumerate(self.portals):
+            ps.sort()
+            for a in ps:
+                if rid < len(self.rooms):
+                    edges = [(b, self._manhattan(a, b)) for b in ps if b != a]
+                else:
+                    dist = self._corridor_bfs(a)
+                    self._corridor_dist[a] = dist
+                    edges = [(b, dist[b]) for b in ps if b != a]
+                self.adj[a].extend(edges)
+
+    def _link(self, a, b):
+        for u, v in ((a, b), (b, a)):
+            if u not in self.adj:
+                self.adj[u] = []
+                self.portals[self.region[u]].append(u)
+            if (v, 1) not in self.adj[u]:
+                self.adj[u].append((v, 1))
+
+    def _manhattan(self, a, b):
+        w = self.grid.w
+        return abs(a % w - b % w) + abs(a // w - b // w)
+
+    def _corridor_bfs(self, src, parents=False):
+        """Steps from `src` to every tile of its corridor piece (and each
+        tile's predecessor if `parents`)."""
+        w, n, region = self.grid.w, len(self.region), self.region
+        rid, wm1 = region[src], w - 1
+        dist, prev, frontier, d = {src: 0}, {src: -1}, [src], 0
+        while frontier:
+            d += 1
+            nxt = []
+            for t in frontier:
+                x = t % w
+                for j in (t+1 if x < wm1 else -1, t-1 if x else -1, t+w, t-w):
+                    if 0 <= j < n and j not in dist and region[j] == rid:
+                        dist[j] = d
+                        prev[j] = t
+                        nxt.append(j)
+            frontier = nxt
+        return (dist, prev) if parents else dist
+
+    def _dist_from(self, src):
+        """Walking distance from `src` to tiles of its own region, as a
+        function of the tile index."""
+        if self.region[src] < len(self.rooms):
+            return lambda t: self._manhattan(src, t)
+        dist = self._corridor_dist.get(src)
+        if dist is None:
+            dist = self._corridor_bfs(src)
+        return dist.__getitem__
+
+    # ---- queries ----
+
+    def path(self, start, goals):
+        """Shortest path (list of (x, y)) from `start` to the nearest of
+        `goals`, like pathfinding.astar without blocked tiles; None if no
+        goal is reachable."""
+        w, region = self.grid.w, self.region
+        n = len(region)
+        s = start[1]*w + start[0]
+        rs = region[s]
+        goal_idx = {gy*w + gx for gx, gy in goals}
+        goal_idx = {g for g in goal_idx if region[g] >= 0}
+        if rs < 0 or not goal_idx:
+            return None
+        if s in goal_idx:
+            return [start]
+        goal_xy = [(g % w, g // w) for g in goal_idx]
+
+        def hfun(t):
+            x, y = t % w, t // w
+            return min(abs(x - gx) + abs(y - gy) for gx, gy in goal_xy)
+
+        # Goals are reached from the portals of their regions (node n + g)
+        finish = {}
+        for g in goal_idx:
+            from_g = self._dist_from(g)
+            for p in self.portals[region[g]]:
+                finish.setdefault(p, []).append((n + g, from_g(p)))
+        from_s = self._dist_from(s)
+        first = [(p, from_s(p)) for p in self.portals[rs]]
+        first += [(n + g, from_s(g)) for g in goal_idx if region[g] == rs]
+        first += self.adj.get(s, [])
+
+        openq = []
+        came = {}
+        best = {s: 0}
+        heappush(openq, (hfun(s), 0, s, -1))
+        while openq:
+            f, d, node, parent = heappop(openq)
+            if node in came:
+                continue
+            came[node] = parent
+            if node >= n:
+                return self._refine(node - n, came, n)
+            steps = first if node == s else self.adj[node] + finish.get(node, [])
+            for v, c in steps:
+                nd = d + c
+                if nd < best.get(v, nd + 1):
+                    best[v] = nd
+                    heappush(openq, (nd + (0 if v >= n else hfun(v)), nd, v, node))
+        return None
+
+    def _refine(self, goal, came, n):
+        """Expand the abstract route ending at `goal` into tiles."""
+        hops = [goal]
+        node = came[n + goal]
+        while node != -1:
+            hops.append(node)
+            node = came[node]
+        hops.reverse()
+        w, region = self.grid.w, self.region
+        tiles = [hops[0]]
+        for a, b in zip(hops, hops[1:]):
+            if a == b:
+                continue
+            rid = region[a]
+            if region[b] != rid:
+                tiles.append(b)  # across a portal
+            elif rid < len(self.rooms):
+                # open rectangle: walk along the row, then the column
+                ax, ay, bx, by = a % w, a // w, b % w, b // w
+                sx = 1 if bx > ax else -1
+                tiles.extend(ay*w + x for x in range(ax + sx, bx + sx, sx))
+                sy = 1 if by > ay else -1
+                tiles.extend(y*w + bx for y in range(ay + sy, by + sy, sy))
+            else:
+                _, prev = self._corridor_bfs(a, parents=True)
+                seg = []
+                t = b
+                while t != a:
+                    seg.append(t)
+                    t = prev[t]
+                tiles.extend(reversed(seg))
+        return [(t % w, t // w) for t in tiles]
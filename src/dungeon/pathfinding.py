@@ -1,5 +1,7 @@
 from heapq import heappop, heappush
-from src.dungeon.constants import WALL
+from collections import deque
+from array import array
+from src.dungeon.grid import as_grid, WALL_CODE
 
 def neighbors4(x, y, w, h):
     for dx, dy in [(1,0), (-1,0), (0,1), (0,-1)]:
@@ -7,45 +9,229 @@ def neighbors4(x, y, w, h):
         if 0 <= nx < w and 0 <= ny < h:
             yield (nx, ny)
 
+# Flat-index neighbors of i follow the same order as neighbors4: +1, -1, +w, -w.
+# Off-map candidates are replaced by -1 so one `0 <= j < n` test rejects them:
+#   (i+1 if x < w-1 else -1, i-1 if x else -1, i+w, i-w)
+
 def astar(grid, start, goals, blocked=set()):
     """Return path (list of (x,y)) from start to nearest goal using A*."""
-    w, h = len(grid[0]), len(grid)
+    grid = as_grid(grid)
+    w, cells = grid.w, grid.cells
+    n, wm1 = len(cells), grid.w - 1
     goals = set(goals)
     if not goals:
         return None
-    def hfun(a):
-        # heuristic to nearest goal (Manhattan)
-        return min(abs(a[0]-gx) + abs(a[1]-gy) for gx, gy in goals)
+    goal_idx = {gy*w + gx for gx, gy in goals}
+    blocked_idx = {by*w + bx for bx, by in blocked}
+    goal_xy = list(goals)
+    if len(goal_xy) == 1:
+        (gx, gy), = goal_xy
+        def hfun(i):
+            return abs(i % w - gx) + abs(i // w - gy)
+    else:
+        def hfun(i):
+            # heuristic to nearest goal (Manhattan)
+            x, y = i % w, i // w
+            return min(abs(x-gx) + abs(y-gy) for gx, gy in goal_xy)
 
+    s = start[1]*w + start[0]
     openq = []
-    heappush(openq, (0 + hfun(start), 0, start, None))
+    heappush(openq, (0 + hfun(s), 0, s, -1))
     came = {}
-    gscore = {start: 0}
-    seen = set()
+    gscore = {s: 0}
 
     while openq:
         f, g, node, parent = heappop(openq)
-        if node in seen:
+        if node in came:
             continue
         came[node] = parent
-        seen.add(node)
-        if node in goals:
+        if node in goal_idx:
             # Reconstruct path
-            path = [node]
+            path = []
             cur = node
-            while came[cur] is not None:
+            while cur != -1:
+                path.append((cur % w, cur // w))
                 cur = came[cur]
-                path.append(cur)
             path.reverse()
             return path
-        x, y = node
-        for nx, ny in neighbors4(x, y, w, h):
-            if grid[ny][nx] == WALL:
+        x = node % w
+        ng = g + 1
+        for j in (node+1 if x < wm1 else -1, node-1 if x else -1, node+w, node-w):
+            if not 0 <= j < n or cells[j] == WALL_CODE or j in blocked_idx:
                 continue
-            if (nx, ny) in blocked:
+            if j not in gscore or ng < gscore[j]:
+                gscore[j] = ng
+                heappush(openq, (ng + hfun(j), ng, j, node))
+    return None
+
+
+class SparseField(dict):
+    """Distance field that only stores the tiles it reached; every other
+    flat index reads as -1, like an unreachable tile of a full field."""
+    __slots__ = ()
+
+    def __missing__(self, i):
+        return -1
+
+
+def distance_field(grid, goals, blocked=set(), max_dist=None):
+    """Multi-source BFS from every goal at once.
+
+    Returns a flat array of steps to the nearest goal for every tile
+    (index y*w+x, -1 where unreachable), so a walker at any tile reaches a
+    nearest goal by stepping downhill. One field costs O(tiles) however many
+    goals there are, and stays valid until the goal set or the walls change.
+
+    With `max_dist` the search stops that many steps out and the result is
+    a SparseField, so the cost depends on the area searched rather than
+    the map size.
+    """
+    grid = as_grid(grid)
+    w, cells = grid.w, grid.cells
+    n, wm1 = len(cells), grid.w - 1
+    dist = array("i", [-1]) * n if max_dist is None else SparseField()
+    blocked_idx = {by*w + bx for bx, by in blocked}
+    q = deque()
+    for gx, gy in goals:
+        i = gy*w + gx
+        if dist[i] < 0 and i not in blocked_idx:
+            dist[i] = 0
+            q.append(i)
+    while q:
+        i = q.popleft()
+        d = dist[i] + 1
+        if max_dist is not None and d > max_dist:
+            continue
+        x = i % w
+        for j in (i+1 if x < wm1 else -1, i-1 if x else -1, i+w, i-w):
+            if 0 <= j < n and dist[j] < 0 and cells[j] != WALL_CODE and j not in blocked_idx:
+                dist[j] = d
+                q.append(j)
+    return dist
+
+
+def path_from_field(grid, field, start):
+    """Walk downhill from `start` to a goal; None if `start` is unreachable."""
+    grid = as_grid(grid)
+    w = grid.w
+    n, wm1 = len(grid.cells), w - 1
+    i = start[1]*w + start[0]
+    d = field[i]
+    if d < 0:
+        return None
+    path = [start]
+    while d > 0:
+        x = i % w
+        for j in (i+1 if x < wm1 else -1, i-1 if x else -1, i+w, i-w):
+            if 0 <= j < n and field[j] == d - 1:
+                break
+        i, d = j, d - 1
+        path.append((i % w, i // w))
+    return path
+
+
+# bytes.translate table: 1 for every passable tile code, 0 for walls
+_PASSABLE = bytes(0 if c == WALL_CODE else 1 for c in range(256))
+
+
+def jps(grid, start, goals, blocked=set()):
+    """Jump point search: same arguments, result and path length as astar(),
+    but only the jump points of open areas go through the heap.
+
+    On a 4-connected grid every shortest path has a canonical form that
+    turns from horizontal to vertical only where a wall forces it. So a
+    horizontal jump runs until a wall, a goal, or a tile whose row above or
+    below opens up just past a wall (a forced turn), and a vertical jump
+    stops where a horizontal jump from it would find something. The steps
+    between jump points are straight runs, filled in at the end.
+    """
+    grid = as_grid(grid)
+    w, cells = grid.w, grid.cells
+    n = len(cells)
+    goals = set(goals)
+    if not goals:
+        return None
+    goal_idx = {gy*w + gx for gx, gy in goals}
+    op = bytearray(cells.translate(_PASSABLE))
+    for bx, by in blocked:
+        op[by*w + bx] = 0
+    goal_xy = list(goals)
+    if len(goal_xy) == 1:
+        (gx, gy), = goal_xy
+        def hfun(i):
+            return abs(i % w - gx) + abs(i // w - gy)
+    else:
+        def hfun(i):
+            x, y = i % w, i // w
+            return min(abs(x-gx) + abs(y-gy) for gx, gy in goal_xy)
+
+    def jump_h(i, dx):
+        # next jump point along the row from i in direction dx, or -1
+        row = i - i % w
+        end = row + w
+        while True:
+            i += dx
+            if not row <= i < end or not op[i]:
+                return -1
+            if i in goal_idx:
+                return i
+            up, down = i - w, i + w
+            if (up >= 0 and op[up] and not op[up - dx]) or \
+                    (down < n and op[down] and not op[down - dx]):
+                return i
+
+    def jump_v(i, dy):
+        # dy is +-w
+        while True:
+            i += dy
+            if not 0 <= i < n or not op[i]:
+                return -1
+            if i in goal_idx or jump_h(i, 1) >= 0 or jump_h(i, -1) >= 0:
+                return i
+
+    s = start[1]*w + start[0]
+    openq = [(hfun(s), 0, s, -1, 0)]
+    came = {}
+    gscore = {s: 0}
+    while openq:
+        f, g, node, parent, d = heappop(openq)
+        if node in came:
+            continue
+        came[node] = parent
+        if node in goal_idx:
+            path = [node]
+            while parent != -1:
+                # fill in the straight run back to the previous jump point
+                cur = path[-1]
+                step = (1 if parent > cur else -1) * (1 if cur // w == parent // w else w)
+                while cur != parent:
+                    cur += step
+                    path.append(cur)
+                parent = came[parent]
+            path.reverse()
+            return [(i % w, i // w) for i in path]
+        # d is the step that reached node: 0 at the start, +-1 or +-w
+        if d == 0:
+            dirs = (1, -1, w, -w)
+        elif d == 1 or d == -1:
+            dirs = [d]
+            up, down = node - w, node + w
+            if up >= 0 and op[up] and not op[up - d]:
+                dirs.append(-w)
+            if down < n and op[down] and not op[down - d]:
+                dirs.append(w)
+        else:
+            dirs = (d, 1, -1)
+        for dd in dirs:
+            j = jump_h(node, dd) if dd == 1 or dd == -1 else jump_v(node, dd)
+            if j < 0:
                 continue
-            ng = g + 1
-            if (nx, ny) not in gscore or ng < gscore[(nx, ny)]:
-                gscore[(nx, ny)] = ng
-                heappush(openq, (ng + hfun((nx, ny)), ng, (nx, ny), node))
-    return None
\ No newline at end of file
+            ng = g + (abs(j - node) if dd == 1 or dd == -1 else abs(j - node) // w)
+            if j not in gscore or ng < gscore[j]:
+                gscore[j] = ng
+                heappush(openq, (ng + hfun(j), ng, j, node, dd))
+    return None
+
+
+# Tile-by-tile searches by config.PATH_SEARCH name
+SEARCHES = {"astar": astar, "jps": jps}
@@ -0,0 +1,138 @@
+from collections.abc import MutableMapping
+
+
+class SpatialIndex(MutableMapping):
+    """Position-keyed map of entities backed by a uniform bucket grid.
+
+    Behaves like a dict {(x, y): value} (and like a set of positions via
+    add()/remove()/discard()), with O(1) insert and remove, plus nearest,
+    radius and rectangle queries that only look at nearby buckets.
+    `version` increases on every change, so callers can cheaply tell
+    whether the contents moved since they last looked.
+    """
+
+    def __init__(self, items=(), cell=8):
+        self.cell = cell
+        self.version = 0
+        self._items = {}
+        self._buckets = {}
+        self._bounds = None  # (min kx, min ky, max kx, max ky) of buckets ever used
+        if isinstance(items, dict):
+            items = items.items()
+        for item in items:
+            if isinstance(item[0], tuple):
+                self[item[0]] = item[1]
+            else:
+                self[item] = None
+
+    # ---- mapping / set interface ----
+
+    def __getitem__(self, pos):
+        return self._items[pos]
+
+    def __setitem__(self, pos, value):
+        if pos not in self._items:
+            key = (pos[0] // self.cell, pos[1] // self.cell)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = set()
+                b = self._bounds
+                kx, ky = key
+                self._bounds = (key + key if b is None else
+                                (min(b[0], kx), min(b[1], ky), max(b[2], kx), max(b[3], ky)))
+            bucket.add(pos)
+        self._items[pos] = value
+        self.version += 1
+
+    def __delitem__(self, pos):
+        del self._items[pos]
+        key = (pos[0] // self.cell, pos[1] // self.cell)
+        bucket = self._buckets[key]
+        bucket.discard(pos)
+        if not bucket:
+            del self._buckets[key]
+        self.version += 1
+
+    def __contains__(self, pos):
+        return pos in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, pos, value=None):
+        self[pos] = value
+
+    def remove(self, pos):
+        del self[pos]
+
+    def discard(self, pos):
+        if pos in self._items:
+            del self[pos]
+
+    def move(self, old, new):
+        """Re-key the entity at `old` to `new`."""
+        self[new] = self._items[old]
+        del self[old]
+
+    # ---- spatial queries ----
+
+    def in_rect(self, x0, y0, x1, y1):
+        """Yield (pos, value) for entities with x0 <= x < x1, y0 <= y < y1."""
+        c = self.cell
+        if len(self._buckets) <= ((x1 - x0) // c + 1) * ((y1 - y0) // c + 1):
+            # Few occupied buckets: scanning them beats probing the rect
+            keys = [k for k in self._buckets
+                    if x0 // c <= k[0] <= (x1 - 1) // c and y0 // c <= k[1] <= (y1 - 1) // c]
+        else:
+            keys = [(bx, by) for by in range(y0 // c, (y1 - 1) // c + 1)
+                    for bx in range(x0 // c, (x1 - 1) // c + 1) if (bx, by) in self._buckets]
+        for k in keys:
+            for pos in self._buckets[k]:
+                if x0 <= pos[0] < x1 and y0 <= pos[1] < y1:
+                    yield pos, self._items[pos]
+
+    def within(self, pos, radius):
+        """Positions within Euclidean `radius` of `pos`."""
+        x, y = pos
+        r2 = radius * radius
+        return [p for p, _ in self.in_rect(x - radius, y - radius, x + radius + 1, y + radius + 1)
+                if (p[0] - x) ** 2 + (p[1] - y) ** 2 <= r2]
+
+    def nearest(self, pos, k=1, max_dist=None):
+        """Up to `k` positions closest to `pos` by Manhattan distance,
+        nearest first. Searches rings of buckets outward and stops once no
+        unvisited bucket can hold anything closer than the k-th best."""
+        if not self._items:
+            return []
+        x, y = pos
+        c = self.cell
+        bx, by = x // c, y // c
+        # Rings past the buckets' bounding box are empty (it only ever
+        # grows, so after removals it may be loose, never too small)
+        x0, y0, x1, y1 = self._bounds
+        max_ring = max(bx - x0, x1 - bx, by - y0, y1 - by)
+        found = []
+        for ring in range(max_ring + 1):
+            if ring == 0:
+                ring_keys = [(bx, by)]
+            else:
+                ring_keys = [(bx + dx, by - ring) for dx in range(-ring, ring + 1)]
+                ring_keys += [(bx + dx, by + ring) for dx in range(-ring, ring + 1)]
+                ring_keys += [(bx - ring, by + dy) for dy in range(-ring + 1, ring)]
+                ring_keys += [(bx + ring, by + dy) for dy in range(-ring + 1, ring)]
+            for key in ring_keys:
+                for p in self._buckets.get(key, ()):
+                    d = abs(p[0] - x) + abs(p[1] - y)
+                    if max_dist is None or d <= max_dist:
+                        found.append((d, p))
+            found.sort()
+            del found[k:]
+            # Anything in ring+1 or beyond is at least ring*c + 1 away
+            bound = ring * c + 1
+            if (len(found) == k and found[-1][0] <= bound) or \
+                    (max_dist is not None and bound > max_dist):
+                break
+        return [p for _, p in found]
@@ -1,92 +1,265 @@
 import random
-from src.dungeon.mapgen import (make_empty_map, place_rooms, connect_rooms, carve_room,
-                            room_center, bfs_distance, all_floor_positions)
-from src.dungeon.constants import EXIT, WALL, LOCKED_EXIT
-from src.dungeon.pathfinding import astar
+from src.dungeon.mapgen import (generate_floor, room_center, bfs_distance,
+                            all_floor_positions)
+from src.dungeon.constants import EXIT, LOCKED_EXIT
+from src.dungeon.pathfinding import SEARCHES, distance_field, path_from_field, SparseField
+from src.dungeon.fov import compute_fov
+from src.dungeon.spatial import SpatialIndex
+from src.dungeon.grid import FLOOR_CODE, WALL_CODE
+from src.combat import fight_odds, resolve_fight, hit_damage, CRIT_CHANCE
 from src.config import (MAP_W, MAP_H, COIN_COUNT, POTION_COUNT, MONSTER_COUNT,
-                    FLOOR_SCALING)
-from src.dungeon.entities import Player, Monster
+                    FLOOR_SCALING, SPEED_KEYS, LAZY_MAP_AREA,
+                    EXIT_CHUNK_DISTANCE, HPA_MIN_AREA, PATH_SEARCH,
+                    CHASE_RADIUS, CHASE_EVERY, CHASE_STRIKE)
+from src.dungeon.chunks import LazyMap
+from src.dungeon.navgraph import NavGraph
+from src.dungeon.entities import Player, MonsterTable
 from src.progress import derived_stats
 
+AVOID_BELOW = 0.5  # win probability under which the runner walks around a fight
+# On lazily generated maps COIN/POTION/MONSTER_COUNT are per this many tiles
+ITEM_DENSITY_AREA = 60 * 24
+FIELD_RADIUS = 120  # distance fields on lazily generated maps stop this far out
+FOV_CACHE_SIZE = 4096  # visible sets a floor keeps for its runners
+FIELD_CACHE_SIZE = 32  # distance fields a floor keeps for its runners
+
+class FloorPlan:
+    """Everything about a floor that doesn't depend on the runner's stats:
+    layout, spawn, exit, item tiles and monsters as
+    (x, y, hp, atk, df, is_boss) tuples.
+
+    Games never modify their plan, so any number of runners can play one
+    (src.party). Each Game copies the items and monsters into its own
+    state and shares the rest, including the FOV and distance-field caches
+    below. Lazily generated floors are the exception: their grid fills in
+    as chunks are carved, so they aren't cached or shared."""
+    def __init__(self, floor, grid, rooms, spawn, exit, coins, potions, monsters,
+                 chunks=None, nav=None):
+        self.floor = floor
+        self.grid = grid
+        self.rooms = rooms
+        self.spawn = spawn
+        self.exit = exit
+        self.coins = coins
+        self.potions = potions
+        self.monsters = monsters
+        self.chunks = chunks  # LazyMap for lazily generated floors
+        self.nav = nav        # NavGraph, built by navgraph() on first use
+        self._fov = {}
+        self._fields = {}
+
+    @property
+    def boss_floor(self):
+        return self.floor % 5 == 0
+
+    def navgraph(self):
+        """The floor's NavGraph. Building one costs several times the BFS
+        that places the exit, so it waits for the first long-path query."""
+        if self.nav is None:
+            self.nav = NavGraph(self.grid, self.rooms)
+        return self.nav
+
+    def fov(self, pos, radius):
+        """compute_fov() from `pos`, as a frozenset cached for every runner."""
+        if self.chunks is not None:
+            return compute_fov(self.grid, pos, radius)
+        key = (pos, radius)
+        seen = self._fov.get(key)
+        if seen is None:
+            if len(self._fov) >= FOV_CACHE_SIZE:
+                del self._fov[next(iter(self._fov))]  # oldest first
+            seen = self._fov[key] = frozenset(compute_fov(self.grid, pos, radius))
+        return seen
+
+    def distance_field(self, goals, max_dist=None):
+        """pathfinding.distance_field() toward `goals`, cached the same way.
+        Runners chasing the same targets get the same (read-only) array."""
+        if self.chunks is not None:
+            return distance_field(self.grid, goals, max_dist=max_dist)
+        key = (tuple(sorted(goals)), max_dist)
+        field = self._fields.get(key)
+        if field is None:
+            if len(self._fields) >= FIELD_CACHE_SIZE:
+                del self._fields[next(iter(self._fields))]
+            field = self._fields[key] = distance_field(self.grid, goals, max_dist=max_dist)
+        return field
+
+
+def plan_floor(floor, rng=random):
+    """Generate floor number `floor`. Only touches `rng`, so it can run in a
+    worker thread (with its own random.Random) while another floor is
+    played."""
+    if MAP_W * MAP_H > LAZY_MAP_AREA:
+        return plan_chunked_floor(floor, rng)
+    grid, rooms = generate_floor(MAP_W, MAP_H, rng)
+    is_boss_floor = (floor % 5 == 0)
+    floors = all_floor_positions(grid)
+
+    # Player spawn at center of first room
+    sx, sy = room_center(rooms[0])
+    # Exit at farthest reachable floor tile
+    dist = bfs_distance(grid, (sx, sy))
+    far = max(range(len(dist)), key=dist.__getitem__)
+    exit_ = (far % grid.w, far // grid.w)
+    grid.set(exit_[0], exit_[1], LOCKED_EXIT if is_boss_floor else EXIT)
+
+    # Place coins
+    open_tiles = [p for p in floors if p != (sx, sy) and p != exit_]
+    rng.shuffle(open_tiles)
+    coins = open_tiles[:COIN_COUNT]
+
+    # Place potions
+    potions = open_tiles[COIN_COUNT:COIN_COUNT+POTION_COUNT]
+
+    # Place monsters
+    mons_tiles = open_tiles[COIN_COUNT+POTION_COUNT:
+                            COIN_COUNT+POTION_COUNT+MONSTER_COUNT]
+    monsters = []
+    if is_boss_floor:
+        # Place a single boss monster
+        mx, my = mons_tiles[0]
+        monsters.append((mx, my, *boss_stats(floor), True))
+
+    for (mx, my) in mons_tiles:
+        if is_boss_floor and (mx, my) == mons_tiles[0]:
+            continue  # skip boss tile
+        monsters.append(_monster(floor, mx, my, rng))
+
+    return FloorPlan(floor, grid, rooms, (sx, sy), exit_, coins, potions, monsters)
+
+
+def boss_stats(floor):
+    """(hp, atk, df) of the boss guarding the exit of a boss floor."""
+    tier = floor // 5
+    return int(40 * (1.15 ** tier)), int(5 * (1.1 ** tier)), int(2 * (1.1 ** tier))
+
+
+def typical_monster(floor):
+    """(hp, atk, df) of an average regular monster on `floor`."""
+    mscale = 1.0 + (floor-1) * (0.15 * FLOORSCALE())
+    return int(12 * mscale), int(4 * mscale + 1), int(1 * mscale + 0.5)
+
+
+def _monster(floor, x, y, rng):
+    mscale = 1.0 + (floor-1) * (0.15 * FLOORSCALE())  # mild scaling
+    hp = int(12 * mscale + rng.randint(-2, 2))
+    atk = int(4 * mscale + rng.randint(0, 2))
+    df  = int(1 * mscale + rng.randint(0, 1))
+    return (x, y, hp, atk, df, False)
+
+
+def plan_chunked_floor(floor, rng=random):
+    """Plan a floor too big to generate up front: only the chunks around the
+    spawn and the one holding the exit are carved now, the rest as the
+    runner approaches them (Game._ensure_chunks)."""
+    chunks = LazyMap(MAP_W, MAP_H, rng.getrandbits(64))
+    sc = (rng.randrange(chunks.cw), rng.randrange(chunks.ch))
+    # The exit sits EXIT_CHUNK_DISTANCE chunks away (fewer near the edges)
+    dx = rng.randint(-EXIT_CHUNK_DISTANCE, EXIT_CHUNK_DISTANCE)
+    dy = (EXIT_CHUNK_DISTANCE - abs(dx)) * rng.choice((-1, 1))
+    ec = (min(max(sc[0] + dx, 0), chunks.cw - 1), min(max(sc[1] + dy, 0), chunks.ch - 1))
+    new = chunks.ensure(*chunks.rect(*sc)[:2])
+    exit_rooms = chunks.generate(*ec)
+    if exit_rooms is not None:
+        new.append((ec[0], ec[1], exit_rooms))
+    rooms = {(cx, cy): r for cx, cy, r in new}
+    spawn = room_center(rooms[sc][0])
+    exit_ = room_center(rooms[ec][-1])
+    if exit_ == spawn:
+        exit_ = (rooms[ec][-1][0], rooms[ec][-1][1])  # the room's corner
+    chunks.grid.set(exit_[0], exit_[1], LOCKED_EXIT if floor % 5 == 0 else EXIT)
+
+    coins, potions, monsters = [], [], []
+    for cx, cy, _ in new:
+        c, p, m = chunk_items(chunks, cx, cy, floor, exclude=(spawn, exit_))
+        coins += c
+        potions += p
+        monsters += m
+    if floor % 5 == 0:
+        # The boss guards the exit: it takes the exit chunk's first monster slot
+        x0, y0, x1, y1 = chunks.rect(*ec)
+        slot = next((i for i, m in enumerate(monsters)
+                     if x0 <= m[0] < x1 and y0 <= m[1] < y1), None)
+        if slot is None:
+            monsters.append(None)
+            slot = -1
+            bx, by = rooms[ec][0][:2]
+        else:
+            bx, by = monsters[slot][:2]
+        monsters[slot] = (bx, by, *boss_stats(floor), True)
+    return FloorPlan(floor, chunks.grid, [r for _, _, rs in new for r in rs], spawn, exit_,
+                     coins, potions, monsters, chunks=chunks)
+
+
+def chunk_items(chunks, cx, cy, floor, exclude=()):
+    """Coins, potions and monsters for one freshly carved chunk, at the
+    same density as a regular floor. Drawn from the chunk's own stream, so
+    the result doesn't depend on when the chunk is generated."""
+    rng = random.Random(f"{chunks.seed}/{cx},{cy}/items")
+    x0, y0, x1, y1 = chunks.rect(cx, cy)
+    w, cells = chunks.grid.w, chunks.grid.cells
+    tiles = [(x, y) for y in range(y0, y1) for x in range(x0, x1)
+             if cells[y*w + x] == FLOOR_CODE and (x, y) not in exclude]
+    rng.shuffle(tiles)
+    scale = (x1 - x0) * (y1 - y0) / ITEM_DENSITY_AREA
+    n_coins, n_potions, n_monsters = (int(k * scale + rng.random())
+                                      for k in (COIN_COUNT, POTION_COUNT, MONSTER_COUNT))
+    coins = tiles[:n_coins]
+    potions = tiles[n_coins:n_coins + n_potions]
+    monsters = [_monster(floor, x, y, rng)
+                for x, y in tiles[n_coins + n_potions:n_coins + n_potions + n_monsters]]
+    return coins, potions, monsters
+
+
 class Game:
-    def __init__(self, progress):
+    def __init__(self, progress, plan=None, rng=None):
+        # Gold and fight rolls; the global `random` unless given a
+        # random.Random (party runners each get their own)
+        self.rng = rng if rng is not None else random
         self.progress = progress
         self.floor = progress["runs"] + 1
         self.speed_mode = "normal"
         self.paused = False
         self.message = ""
         self.player = Player(0, 0, max_hp=28, atk=6, df=2, regen=.1) # temp init
-        self._build_floor()
+        self._build_floor(plan)
         self.visible = set()
         self.explored = set()
-        self.height = len(self.grid)
-        self.width = len(self.grid[0])
+        self.explored_order = []  # explored tiles in discovery order, for renderers
+        self.height = self.grid.h
+        self.width = self.grid.w
         self.log = []
-        
+        self.ticks = 0
+        self.death_cause = None
+        self.instant_combat = False      # resolve whole fights in one tick
+        self.avoid_losing_fights = True  # detour around fights with win < AVOID_BELOW
+        self.track_fov = True  # keep visible/explored current; headless runs turn it off
+        self.recorder = None  # src.replay.Recorder, if this floor is being recorded
+        self.tracer = None    # src.trace.Tracer, if phases are being timed
 
     def log_event(self, msg):
         self.log.append(msg)
         if len(self.log) > 5:
             self.log.pop(0)
 
-    def _blocks_sight(self, x, y):
-        return self.grid[y][x] == WALL
-
-    def _bresenham_line(self, x0, y0, x1, y1):
-        """Yield all tiles on the line from (x0,y0) to (x1,y1)."""
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-        err = dx - dy
-        while True:
-            yield (x0, y0)
-            if x0 == x1 and y0 == y1:
-                break
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x0 += sx
-            if e2 < dx:
-                err += dx
-                y0 += sy
-
     def compute_visibility(self, radius=8):
         px, py = self.player.x, self.player.y
-        self.visible.clear()
-        # Always see your own tile
-        self.visible.add((px, py))
-        self.explored.add((px, py))
-        for y in range(py - radius, py + radius + 1):
-            for x in range(px - radius, px + radius + 1):
-                if 0 <= x < self.width and 0 <= y < self.height:
-                    dx = x - px
-                    dy = y - py
-                    if dx*dx + dy*dy <= radius*radius:
-                        # Cast a ray from player to (x,y)
-                        blocked = False
-                        for (lx, ly) in self._bresenham_line(px, py, x, y):
-                            if self._blocks_sight(lx, ly) and (lx, ly) != (x, y):
-                                blocked = True
-                                break
-                        if not blocked:
-                            self.visible.add((x, y))
-                            self.explored.add((x, y))
-
-    def _build_floor(self):
-        # Stats from upgrades
-        max_hp, atk, df, regen = derived_stats(self.progress)
-        self.grid = make_empty_map(MAP_W, MAP_H)
-        rooms = place_rooms(self.grid)
-        is_boss_floor = (self.floor % 5 == 0)
-        self.exit_locked = is_boss_floor
-        if not rooms:
-            # ensure at least one room
-            carve_room(self.grid, 2, 2, 8, 6)
-            rooms = [(2,2,8,6)]
-        connect_rooms(self.grid, rooms)
-        floors = all_floor_positions(self.grid)
+        self.visible = self.plan.fov((px, py), radius)
+        new = self.visible - self.explored
+        if new:
+            self.explored |= new
+            self.explored_order.extend(new)
 
+    def _build_floor(self, plan=None):
+        if plan is None or plan.floor != self.floor:
+            plan = plan_floor(self.floor, self.rng)
+        self.plan = plan  # shared, read-only
+        self.grid = plan.grid
+        self.rooms = plan.rooms
+        self.exit = plan.exit
+        self.exit_locked = plan.boss_floor
+
+        # Stats from upgrades, applied at handoff
         max_hp, atk, df, regen = derived_stats(self.progress)
         hp_ratio = self.player.hp / self.player.max_hp if self.player.max_hp > 0 else 1.0
         self.player.max_hp = max_hp
@@ -94,62 +267,67 @@ class Game:
         self.player.df = df
         self.player.regen = regen
         self.player.hp = int(self.player.max_hp * hp_ratio)
-        # Player spawn at center of first room
-        sx, sy = room_center(rooms[0])
-        self.player.x, self.player.y = sx, sy
-        # Exit at farthest reachable floor tile
-        dist = bfs_distance(self.grid, (sx, sy))
-        far = max(dist.items(), key=lambda kv: kv[1])[0]
-        self.exit = far
-        ex, ey = self.exit
-        self.grid[ey][ex] = LOCKED_EXIT if is_boss_floor else EXIT
-
-        # Place coins
-        open_tiles = [p for p in floors if p != (sx, sy) and p != self.exit]
-        random.shuffle(open_tiles)
-        self.coins = set(open_tiles[:COIN_COUNT])
-
-        # Place potions
-        pts = [p for p in open_tiles[COIN_COUNT:COIN_COUNT+POTION_COUNT]]
-        self.potions = set(pts)
-
-        # Place monsters
-        mons_tiles = [p for p in open_tiles[COIN_COUNT+POTION_COUNT:
-                                            COIN_COUNT+POTION_COUNT+MONSTER_COUNT]]
-        self.monsters = {}
-
-        if is_boss_floor:
-            # Place a single boss monster
-            mx, my = mons_tiles[0]
-            hp = int(40 * (1.15 ** (self.floor // 5)))  # scale boss HP
-            atk = int(5 * (1.1 ** (self.floor // 5)))
-            df  = int(2 * (1.1 ** (self.floor // 5)))
-            boss = Monster(mx, my, hp, atk, df)
-            boss.is_boss = True
-            self.monsters[(mx, my)] = boss
-        else:
-            # Regular monsters
-            pass
-
-        mscale = 1.0 + (self.floor-1) * (0.15 * FLOORSCALE())  # mild scaling
-        for (mx, my) in mons_tiles:
-            if is_boss_floor and (mx, my) in self.monsters:
-                continue  # skip boss tile
-            hp = int(12 * mscale + random.randint(-2, 2))
-            atk = int(4 * mscale + random.randint(0, 2))
-            df  = int(1 * mscale + random.randint(0, 1))
-            self.monsters[(mx, my)] = Monster(mx, my, hp, atk, df)
+        self.player.x, self.player.y = plan.spawn
+
+        self.coins = SpatialIndex(plan.coins)
+        self.potions = SpatialIndex(plan.potions)
+        self.monster_table = MonsterTable()
+        self.monsters = SpatialIndex()
+        self.boss = None
+        for (mx, my, hp, atk, df, is_boss) in plan.monsters:
+            mon = self.monster_table.spawn(mx, my, hp, atk, df, is_boss)
+            if is_boss:
+                self.boss = mon
+            self.monsters[(mx, my)] = mon
+
+        # long paths on big floors go over the room graph
+        self._use_nav = bool(plan.rooms) and plan.chunks is None \
+            and self.grid.w * self.grid.h >= HPA_MIN_AREA
+
+        # lazily generated floors
+        self.chunks = plan.chunks
+        self.field_limit = FIELD_RADIUS if self.chunks else None
+        self._chunk_at = None  # chunk the surroundings were last generated for
+        self.sweep = None      # chunk whose coins the runner is collecting
 
         # combat state
         self.fighting = None  # (x,y) of monster currently engaged
         self.path = None      # current path being followed
+        self.field = None     # distance field toward the current target set
+        self.field_key = None  # identifies the target set the field was built for
+        self.field_goals = None
+        self.blocked = set()  # traps, locked doors, hazards: see set_blocked()
+        self.avoided = set()  # monsters routed around by _avoid_fight()
+        self.chase_field = None  # steps to the runner, for monsters to walk down
+        self._chase_from = None  # runner tile chase_field was built from
+
+    def apply_input(self, key):
+        """Apply a pause or speed key. Returns False for keys the game
+        doesn't handle (quitting is up to the caller)."""
+        if key in ("p", "P"):
+            self.paused = not self.paused
+        elif key in SPEED_KEYS:
+            self.speed_mode = SPEED_KEYS[key]
+        else:
+            return False
+        if self.recorder:
+            self.recorder.record_key(self, key)
+        return True
 
     def tick(self):
         if self.paused:
             return
-        self.player.tick_regen()
+        self.ticks += 1
+        self._step()
+        if self.recorder:
+            self.recorder.on_tick(self)
+
+    def _step(self):
+        self._regen()
         if self._handle_combat():
             return
+        if CHASE_RADIUS > 0 and self.ticks % CHASE_EVERY == 0 and self._move_monsters():
+            return
         ppos = (self.player.x, self.player.y)
         if self._handle_pickups(ppos):
             return
@@ -158,15 +336,21 @@ class Game:
                 self.log_event("The exit is locked! Defeat the boss to unlock.")
                 return
             return
-        targets = self._choose_targets()
-        self._move_along_path(ppos, targets)
-        self.compute_visibility()
+        if self.chunks is not None:
+            self._ensure_chunks(ppos)
+        key, targets = self._choose_targets()
+        self._move_along_path(ppos, key, targets)
+        if self.track_fov or CHASE_RADIUS > 0:  # chasers need to see the runner
+            self.compute_visibility()
+
+    def _regen(self):
+        self.player.tick_regen()
 
     def _handle_pickups(self, ppos):
         picked = False
         if ppos in self.coins:
             self.coins.remove(ppos)
-            gold = random.randint(2, 5)
+            gold = self.rng.randint(2, 5)
             self.player.gold += gold
             self.log_event(f"Picked up {gold} coins!")
             picked = True
@@ -183,15 +367,22 @@ class Game:
             mx, my = self.fighting
             monster = self.monsters.get((mx, my))
             if monster and monster.is_alive():
-                self._combat_round(self.player, monster)
-                if not monster.is_alive():
+                if self.instant_combat:
+                    rounds = resolve_fight(self.player, monster, self.rng, first_regen=False)
+                    self.log_event(f"Fight resolved in {rounds} rounds.")
+                else:
+                    self._combat_round(self.player, monster)
+                if not self.player.is_alive():
+                    self.death_cause = "boss" if monster.is_boss else "monster"
+                elif not monster.is_alive():
                     del self.monsters[(mx, my)]
                     self.player.kills += 1
-                    if getattr(monster, "is_boss", False):
+                    is_boss = monster.is_boss
+                    self.monster_table.release(monster)
+                    if is_boss:
+                        self.boss = None
                         self.exit_locked = False
                         self.log_event("Boss defeated! The exit is now unlocked.")
-                        ex, ey = self.exit
-                        self.grid[ey][ex] = EXIT
                     else:
                         self.log_event("Monster defeated!")
                 return True
@@ -199,56 +390,301 @@ class Game:
                 self.fighting = None
         return False
     
+    def _move_monsters(self):
+        """Step every regular monster within CHASE_RADIUS that the runner
+        can see toward it.
+
+        One BFS from the runner's tile (redone only when the runner has
+        moved) is shared by all of them: each steps to a free neighbour one
+        step closer, nearest monsters first, so the tick costs one bounded
+        BFS plus O(monsters nearby) however many are chasing. Bosses hold
+        their ground. A monster that steps next to the runner attacks;
+        returns True if one did. One that was already next to it (the
+        runner walked up) doesn't: walking into it is up to the runner.
+
+        Chasers the runner would probably lose to are then walled off by
+        _avoid_chasers(). _step() only calls this every CHASE_EVERY ticks,
+        so the runner can outpace what it avoids.
+        """
+        ppos = (self.player.x, self.player.y)
+        if ppos != self._chase_from:
+            self.chase_field = distance_field(self.grid, [ppos], max_dist=CHASE_RADIUS)
+            self._chase_from = ppos
+        field, monsters = self.chase_field, self.monsters
+        w, n = self.grid.w, len(self.grid.cells)
+        wm1 = w - 1
+        px, py = ppos
+        r = CHASE_RADIUS
+        visible = self.visible
+        chasers = []
+        for (x, y), mon in monsters.in_rect(px - r, py - r, px + r + 1, py + r + 1):
+            d = field[y*w + x]
+            if d > 0 and not mon.is_boss and (x, y) in visible:
+                chasers.append((d, y*w + x, mon))  # (d, i) are unique
+        chasers.sort()
+        attacked = False
+        for d, i, mon in chasers:
+            x = i % w
+            if d > 1:
+                best = None
+                for j in (i+1 if x < wm1 else -1, i-1 if x else -1, i+w, i-w):
+                    if 0 <= j < n and field[j] == d - 1:
+                        to = (j % w, j // w)
+                        # of the steps closer, the one lining up with the
+                        # runner's row or column, to cut it off
+                        line_up = min(abs(to[0] - px), abs(to[1] - py))
+                        if to not in monsters and (best is None or line_up < best[0]):
+                            best = (line_up, to)
+                if best is not None:
+                    to = best[1]
+                    monsters.move((x, i // w), to)
+                    mon.x, mon.y = to
+                    if d == 2:
+                        self.fighting = to
+                        self.log_event("A monster attacks!")
+                        attacked = True
+                        break
+        self._avoid_chasers(chasers, r + CHASE_STRIKE)
+        return attacked
+
+    def _avoid_chasers(self, chasers, reach):
+        """Block the tiles of chasers the runner would probably lose to,
+        and every tile within CHASE_STRIKE steps of them, so paths keep out
+        of their reach; last time's blocks within `reach` of the runner
+        are lifted first, as those chasers may have moved."""
+        px, py = self.player.x, self.player.y
+        for pos in [p for p in self.avoided
+                    if abs(p[0] - px) <= reach and abs(p[1] - py) <= reach]:
+            self.avoided.discard(pos)
+            self.blocked.discard(pos)
+        if not self.avoid_losing_fights:
+            return
+        cells, w, h = self.grid.cells, self.grid.w, self.grid.h
+        zone = set()
+        for _, _, mon in chasers:
+            if self.fighting == (mon.x, mon.y):
+                continue
+            if fight_odds(self.player, mon).win >= AVOID_BELOW:
+                continue
+            ring = [(mon.x, mon.y)]
+            zone.add(ring[0])
+            for _ in range(CHASE_STRIKE):
+                ring = [to for x, y in ring
+                        for to in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+                        if to not in zone and 0 <= to[0] < w and 0 <= to[1] < h
+                        and cells[to[1]*w + to[0]] != WALL_CODE]
+                zone.update(ring)
+        zone.discard((px, py))
+        zone -= self.blocked  # traps etc. stay blocked when the zone lifts
+        if zone:
+            self.avoided |= zone
+            self.blocked |= zone
+            if self.path and not zone.isdisjoint(self.path):
+                self.path = self._repair_path(self.path)
+
+    def _ensure_chunks(self, ppos):
+        """Carve the chunks around the runner as it reaches new ones and
+        stock them with items and monsters."""
+        chunk = self.chunks.chunk_of(*ppos)
+        if chunk == self._chunk_at:
+            return
+        self._chunk_at = chunk
+        for cx, cy, _ in self.chunks.ensure(*ppos):
+            coins, potions, monsters = chunk_items(self.chunks, cx, cy, self.floor)
+            for pos in coins:
+                self.coins.add(pos)
+            for pos in potions:
+                self.potions.add(pos)
+            for (mx, my, hp, atk, df, is_boss) in monsters:
+                self.monsters[(mx, my)] = self.monster_table.spawn(mx, my, hp, atk, df, is_boss)
+
     def _choose_targets(self):
-        """Return a list of target tiles based on player state."""
+        """Return (key, targets) based on player state. `key` changes
+        whenever the target set does, so callers never have to copy or
+        compare the targets themselves."""
+        if self.chunks is not None:
+            return self._choose_chunked_targets()
 
         # If the exit is locked, the boss is the priority
         if getattr(self, "exit_locked", False):
             boss_pos = self._boss_position()
             if boss_pos:
-                return [boss_pos]
+                return ("boss", boss_pos), [boss_pos]
 
         # Normal behavior
         low_hp = self.player.hp <= int(self.player.max_hp * 0.35)
 
         if low_hp and self.potions:
-            return list(self.potions)
+            return ("potions", self.potions.version), self.potions
 
         if self.coins:
-            return list(self.coins)
+            return ("coins", self.coins.version), self.coins
 
-        return [self.exit]
+        return ("exit", self.exit), [self.exit]
 
 
-    def _move_along_path(self, ppos, targets):
-        blocked = set()  # future: traps, locked doors, hazards
-        path = astar(self.grid, ppos, targets, blocked=blocked)
-        self.path = path
+    def _choose_chunked_targets(self):
+        """_choose_targets() for lazily generated floors. Only coins in one
+        chunk at a time count (the one the runner was in when it started
+        on them), so newly carved chunks can't keep it from the exit forever
+        and stepping back and forth over a chunk edge doesn't flip targets;
+        a boss or exit whose chunk isn't linked up yet is approached through
+        the doors of the generated area nearest to it."""
+        chunks = self.chunks
+        ppos = (self.player.x, self.player.y)
+        here = chunks.chunk_of(*ppos)
+        boss_pos = self._boss_position() if self.exit_locked else None
+        if boss_pos is None:
+            low_hp = self.player.hp <= int(self.player.max_hp * 0.35)
+            if low_hp and self.potions:
+                near = self.potions.nearest(ppos, k=3, max_dist=2 * chunks.size)
+                if near:
+                    return ("potions", self.potions.version), near
+            coins = self._sweep_coins(self.sweep) if self.sweep else []
+            if not coins:
+                self.sweep = here
+                coins = self._sweep_coins(here)
+            if coins:
+                return ("coins", self.coins.version, self.sweep), coins
+        name, goal = ("boss", boss_pos) if boss_pos else ("exit", self.exit)
+        goal_chunk = chunks.chunk_of(*goal)
+        if chunks.linked(here, goal_chunk):
+            return (name, goal), [goal]
+        return ("frontier", chunks.version, goal_chunk), chunks.frontier(here, goal_chunk)
+
+    def _sweep_coins(self, chunk):
+        return sorted(p for p, _ in self.coins.in_rect(*self.chunks.rect(*chunk)))
+
+    def _move_along_path(self, ppos, key, targets):
+        if key != self.field_key:
+            # Target set changed (pickup, kill, new priority): rebuild the field
+            self.field_goals = list(targets)
+            if self._use_nav and len(self.field_goals) == 1:
+                self.field = None  # one far goal: plan over the room graph instead
+            else:
+                self.field = self.plan.distance_field(self.field_goals, self.field_limit)
+            self.field_key = key
+            self.path = None
+            self._stop_avoiding()
+        if not self.path or self.path[0] != ppos:
+            self._replan(ppos)
+        if (not self.path or len(self.path) <= 1) and self.avoided:
+            # Every way on passes monsters it meant to avoid: walk on and
+            # face them rather than wait for chasers that may never come
+            self._stop_avoiding()
+            self._replan(ppos)
+        path = self.path
         if not path or len(path) <= 1:
             self.log_event("No path")
             return
         nx, ny = path[1]
-        if (nx, ny) in self.monsters:
+        mon = self.monsters.get((nx, ny))
+        while mon is not None and self._avoid_fight((nx, ny), mon):
+            # Rerouted around a fight we'd likely lose
+            path = self.path
+            nx, ny = path[1]
+            mon = self.monsters.get((nx, ny))
+        if mon is not None:
             self.fighting = (nx, ny)
-            mon = self.monsters[(nx, ny)]
-            if getattr(mon, "is_boss", False):
+            if mon.is_boss:
                 self.log_event("A boss appears!")
             else:
                 self.log_event("Encounter!")
             return
         self.player.x, self.player.y = nx, ny
+        del path[0]
+
+    def _replan(self, ppos):
+        """Fresh cached path from `ppos`, around every blocked tile."""
+        self.path = self._plan_path(ppos)
+        if self.path is None and isinstance(self.field, SparseField):
+            # Goals beyond the bounded field: search the whole map once
+            self.field = self.plan.distance_field(self.field_goals)
+            self.path = path_from_field(self.grid, self.field, ppos)
+        if self.path and self.blocked:
+            self.path = self._repair_path(self.path)
+
+    def _stop_avoiding(self):
+        for pos in self.avoided:
+            self.set_blocked(pos, False)
+        self.avoided.clear()
+
+    @property
+    def nav(self):
+        """The floor's NavGraph on big regular floors, else None."""
+        return self.plan.navgraph() if self._use_nav else None
+
+    def _plan_path(self, ppos):
+        """Path from `ppos` to the current targets: down the distance field,
+        or over the room graph when there is no field."""
+        if self.field is None:
+            return self.nav.path(ppos, self.field_goals)
+        return path_from_field(self.grid, self.field, ppos)
+
+    def _avoid_fight(self, pos, mon):
+        """Block a monster the runner would probably lose to and detour
+        around it. Bosses are always fought; so is anything with no way
+        around. Returns True if the cached path now avoids `pos`."""
+        if mon.is_boss or not self.avoid_losing_fights or pos in self.avoided:
+            return False
+        if fight_odds(self.player, mon).win >= AVOID_BELOW:
+            return False
+        self.avoided.add(pos)
+        self.set_blocked(pos)
+        if self.path and len(self.path) > 1 and self.path[0] == (self.player.x, self.player.y):
+            return True
+        self.set_blocked(pos, False)
+        self.path = self._plan_path((self.player.x, self.player.y))
+        return False
+
+    def set_blocked(self, pos, blocked=True):
+        """Mark a tile impassable (or passable again) for the runner.
+
+        A newly blocked tile on the cached path gets a local detour spliced
+        in; nothing else is replanned.
+        """
+        if blocked:
+            self.blocked.add(pos)
+            if self.path and pos in self.path:
+                self.path = self._repair_path(self.path)
+        else:
+            self.blocked.discard(pos)
+
+    def _repair_path(self, path):
+        """Splice detours around blocked tiles into `path` (searched with
+        SEARCHES[PATH_SEARCH]), rejoining it at the first free tile past each
+        blocked run. Falls back to a fresh field that avoids every blocked
+        tile if a detour cannot rejoin."""
+        i = 1
+        while i < len(path):
+            if path[i] not in self.blocked:
+                i += 1
+                continue
+            j = i
+            while j < len(path) and path[j] in self.blocked:
+                j += 1
+            detour = None
+            if j < len(path):
+                search = SEARCHES[PATH_SEARCH]
+                detour = search(self.grid, path[i-1], [path[j]], blocked=self.blocked)
+            if detour is None:
+                field = distance_field(self.grid, self.field_goals, blocked=self.blocked,
+                                       max_dist=self.field_limit)
+                return path_from_field(self.grid, field, path[0])
+            path[i-1:j+1] = detour
+            i += len(detour) - 1
+        return path
 
     def _boss_position(self):
-        for pos, mon in self.monsters.items():
-            if getattr(mon, "is_boss", False):
-                return pos
-        return None
+        if self.boss is None:
+            return None
+        return (self.boss.x, self.boss.y)
 
     def _combat_round(self, p, m):
         # Player attacks
-        dmg_p = max(1, p.atk - m.df)
-        if random.random() < 0.10:  # crit chance
-            dmg_p = int(dmg_p * 1.5)
+        dmg_p, crit_dmg = hit_damage(p.atk, m.df)
+        if self.rng.random() < CRIT_CHANCE:
+            dmg_p = crit_dmg
             self.log_event("Critical hit!")
         m.hp -= dmg_p
         m.flash = 2
@@ -259,6 +695,22 @@ class Game:
             p.hp -= dmg_m
             p.flash = 2
 
+    def summary(self):
+        """Outcome and runner stats of this floor, as logged to the run
+        history."""
+        p = self.player
+        result = self.result()
+        return {
+            "floor": self.floor,
+            "result": result,
+            "cause": self.death_cause if result == "dead" else None,
+            "ticks": self.ticks,
+            "gold": p.gold,
+            "kills": p.kills,
+            "hp": max(0, p.hp),
+            "max_hp": p.max_hp, "atk": p.atk, "df": p.df, "regen": p.regen,
+        }
+
     def is_over(self):
         if not self.player.is_alive():
             return True 
@@ -37,3 +37,27 @@ class KeyReader:
             if msvcrt.kbhit():
                 return msvcrt.getwch()
             return None
+
+    def fileno(self):
+        """File descriptor to watch for key presses, or None if input can
+        only be polled (Windows, or stdin is not a terminal)."""
+        if USE_WINDOWS:
+            return None
+        return self.fd
+
+    def read_keys(self):
+        """Return every key pressed since the last call (possibly none)."""
+        if not USE_WINDOWS:
+            if self.fd is None:
+                return []
+            keys = []
+            while select.select([self.fd], [], [], 0)[0]:
+                data = os.read(self.fd, 1024)
+                if not data:
+                    break
+                keys.extend(data.decode(errors="ignore"))
+            return keys
+        keys = []
+        while msvcrt.kbhit():
+            keys.append(msvcrt.getwch())
+        return keys
@@ -2,53 +2,205 @@
 # Idle Roguelite — watch a player auto-run dungeons with meta progression.
 # Pure Python, cross-platform terminal. No external libraries required.
 
-import time, random, os
-from src.config import TICK_SPEEDS
-from src.render import draw
+import argparse, asyncio, contextlib, time, random, os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.config import TICK_SPEEDS, SPEED_KEYS
+from src.render import draw, reset_frame
 from src.input import KeyReader
 from src.progress import load_progress, save_progress, apply_auto_upgrades, derived_stats
-from src.game import Game
+from src.store import RunHistory
+from src.game import Game, plan_floor
+from src.render_process import RenderProcess
+from src.replay import Recorder
+from src.savestate import save_game, load_game, delete_save
+from src.trace import Tracer
+from src.balance import apply_overrides
 
 
-def run_floor(progress):
-    game = Game(progress)
-    with KeyReader() as kr:
-        while True:
-            draw(game)
-            if game.is_over():
-                result = game.result()
-                if result == "dead":
-                    game.log_event("💀 The runner has died!")
-                    try:
-                        os.remove("progress.json")
-                    except FileNotFoundError:
-                        pass
-                    return False  # floor over, do not continue
-                elif result == "escaped":
-                    game.log_event("🚪 The runner has escaped the floor!")
-                    progress["bank_gold"] += game.player.gold
-                    progress["runs"] += 1
-                    return True  # floor over, continue to next floor
-            # Input
-            key = kr.read_key()
-            if key:
-                if key in ("q", "Q"):
-                    # Save progress and exit whole program
-                    progress["bank_gold"] += game.player.gold
-                    progress["runs"] += 1
-                    draw(game)
-                    return False  # signal quit
-                if key in ("p", "P"):
-                    game.paused = not game.paused
-                if key in ("1", "2", "3"):
-                    game.speed_mode = {"1":"slow","2":"normal","3":"fast"}[key]
-
-            # Sim tick
-            game.tick()
-            time.sleep(TICK_SPEEDS[game.speed_mode])
-    return True  # floor complete (dead or escaped)
-
-def main():
+MAX_CATCHUP = 5     # ticks run back-to-back before dropping the backlog
+KEY_POLL = 0.01     # seconds between key polls where stdin can't be watched
+AUTOSAVE_EVERY = 10.0  # seconds between mid-floor saves
+
+
+def _end_floor(game, progress, history=None):
+    """Settle a finished floor; return True to continue to the next one."""
+    result = game.result()
+    delete_save()  # the floor is settled; nothing to resume
+    if history:
+        history.record(game.summary())
+    if result == "dead":
+        # Banked gold and upgrades are kept; only this floor's gold is lost
+        game.log_event("💀 The runner has died!")
+        return False  # floor over, do not continue
+    game.log_event("🚪 The runner has escaped the floor!")
+    progress["bank_gold"] += game.player.gold
+    progress["runs"] += 1
+    return True  # floor over, continue to next floor
+
+
+async def run_floor_async(progress, render_process=False, fps=30, plan=None, recorder=None,
+                          resume=None, history=None, tracer=None):
+    game = resume or Game(progress, plan=plan)
+    if recorder:
+        recorder.start(game)
+    reset_frame()  # the screen was printed over between floors
+    # Optionally draw from a separate process so a slow terminal can't
+    # hold up the simulation
+    renderer = RenderProcess(fps=fps) if render_process else None
+    present = renderer.publish if renderer else lambda game, force=False: draw(game)
+    if tracer:
+        tracer.attach(game)
+        present = tracer.wrap("draw", present)
+
+    def show(force=False):
+        present(game, force=force)
+
+    loop = asyncio.get_running_loop()
+    keys = deque()
+    key_ready = asyncio.Event()
+
+    def on_keys(new):
+        if new:
+            keys.extend(new)
+            key_ready.set()
+    with KeyReader() as kr, (renderer or contextlib.nullcontext()), \
+            (recorder or contextlib.nullcontext()):
+        fd = kr.fileno()
+        if fd is not None:
+            # Event-driven input: every pending key is queued as soon as it
+            # arrives, independent of the tick interval
+            loop.add_reader(fd, lambda: on_keys(kr.read_keys()))
+        try:
+            show()
+            next_tick = time.monotonic()
+            last_frame = 0.0
+            last_save = next_tick
+            while True:
+                # Drain all pending keys
+                if fd is None:
+                    on_keys(kr.read_keys())
+                key_ready.clear()
+                while keys:
+                    key = keys.popleft()
+                    if key in ("q", "Q"):
+                        # Save the floor as it stands and exit whole program
+                        save_game(game)
+                        show(force=True)
+                        if recorder:
+                            recorder.close(game)
+                        return False  # signal quit
+                    if game.apply_input(key) and key in SPEED_KEYS:
+                        next_tick = time.monotonic()
+
+                # Sim ticks, scheduled on the monotonic clock so tick and
+                # draw time don't stretch the interval
+                interval = TICK_SPEEDS[game.speed_mode]
+                now = time.monotonic()
+                if interval <= 0 and game.paused:
+                    # Nothing to run: wait for a key or the next frame
+                    next_tick = now + 1.0 / fps
+                elif interval <= 0:
+                    # Uncapped: tick flat out, drawing at most `fps` times/s
+                    while not game.is_over() and time.monotonic() - now < 1.0 / fps:
+                        game.tick()
+                    next_tick = time.monotonic()
+                else:
+                    if now - next_tick > MAX_CATCHUP * interval:
+                        next_tick = now  # too far behind: skip the backlog
+                    ran = 0
+                    while next_tick <= now and ran < MAX_CATCHUP and not game.is_over():
+                        game.tick()
+                        next_tick += interval
+                        ran += 1
+
+                if game.is_over():
+                    show(force=True)
+                    if recorder:
+                        recorder.close(game)
+                    return _end_floor(game, progress, history)
+                if interval > 0 or time.monotonic() - last_frame >= 1.0 / fps:
+                    show()
+                    last_frame = time.monotonic()
+                if last_frame - last_save >= AUTOSAVE_EVERY:
+                    save_game(game)
+                    last_save = last_frame
+
+                # Sleep until the next tick, waking early for input
+                timeout = max(0.0, next_tick - time.monotonic())
+                if fd is None:
+                    timeout = min(timeout, KEY_POLL)
+                try:
+                    await asyncio.wait_for(key_ready.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+
+
+def run_floor(progress, render_process=False, fps=30, plan=None, recorder=None, resume=None,
+              history=None, tracer=None):
+    return asyncio.run(run_floor_async(progress, render_process=render_process, fps=fps,
+                                       plan=plan, recorder=recorder, resume=resume,
+                                       history=history, tracer=tracer))
+
+
+def _recorder_for(record_dir, floor):
+    """Reseed the game RNG and open a replay file for this floor."""
+    seed = random.getrandbits(64)
+    random.seed(seed)
+    os.makedirs(record_dir, exist_ok=True)
+    name = f"{int(time.time())}-floor{floor}.replay"
+    return Recorder(os.path.join(record_dir, name), seed=seed)
+
+
+def _map_size(text):
+    try:
+        w, h = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WxH, got {text!r}")
+    if w < 20 or h < 10:
+        raise argparse.ArgumentTypeError("maps must be at least 20x10")
+    return w, h
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Idle Roguelite")
+    ap.add_argument("--render-process", action="store_true",
+                    help="draw from a separate process fed through shared memory")
+    ap.add_argument("--fps", type=int, default=30, help="frame rate of the render process")
+    ap.add_argument("--record", metavar="DIR",
+                    help="write a replay of every floor to DIR (see python -m src.replay)")
+    ap.add_argument("--timing", action="store_true",
+                    help="time tick phases and drawing; show p50/p99 in the HUD")
+    ap.add_argument("--trace", metavar="FILE",
+                    help="like --timing, and write a Chrome trace (chrome://tracing) to FILE")
+    ap.add_argument("--map-size", type=_map_size, metavar="WxH",
+                    help="map size; above 100000 tiles floors are generated lazily "
+                         "and the view scrolls (e.g. 1000x1000)")
+    ap.add_argument("--chase", type=int, metavar="N",
+                    help="monsters within N steps chase the runner")
+    args = ap.parse_args(argv)
+    overrides = {}
+    if args.map_size:
+        overrides.update(MAP_W=args.map_size[0], MAP_H=args.map_size[1])
+    if args.chase:
+        overrides["CHASE_RADIUS"] = args.chase
+    if overrides:
+        apply_overrides(overrides)
+    tracer = Tracer(events=bool(args.trace), overlay=True) if args.timing or args.trace else None
+    try:
+        _play(args, tracer)
+    finally:
+        if tracer:
+            print("\n" + tracer.report())
+            if args.trace:
+                tracer.export(args.trace)
+                print(f"Trace written to {args.trace}")
+
+
+def _play(args, tracer=None):
     random.seed()
     progress = load_progress()
     # Auto-spend banked gold on upgrades (policy can be tweaked)
@@ -60,25 +212,43 @@ def main():
     print(f"Runs completed: {progress['runs']}")
     print(f"Banked gold: {progress['bank_gold']}")
     print(f"Stats after upgrades: HP {max_hp} ATK {atk} DEF {df} Regen {regen:.2f}/tick")
-    print("Starting floor in 2 seconds...")
+    resume = load_game(progress=progress)
+    if resume and resume.floor != progress["runs"] + 1:
+        resume = None  # stale save from another progress file
+    if resume:
+        print(f"Resuming floor {resume.floor} at tick {resume.ticks}...")
+    else:
+        print("Starting floor in 2 seconds...")
     time.sleep(2)
 
-    # Floor loop (keep watching new floors until quit)
-    while True:
-        keep_going = run_floor(progress)
-        save_progress(progress)
-        if not keep_going:
-            print("\nProgress saved. Goodbye!")
-            break
-        # Between floors: auto-upgrade again
-        apply_auto_upgrades(progress)
-        max_hp, atk, df, regen = derived_stats(progress)
-        print("\n--- Floor complete ---")
-        print(f"Total runs: {progress['runs']}")
-        print(f"Banked gold (after auto-upgrades): {progress['bank_gold']}")
-        print(f"Stats: HP {max_hp} ATK {atk} DEF {df} Regen {regen:.2f}/tick")
-        print("Next floor starts in 3 seconds... (press Ctrl+C to exit)")
-        time.sleep(3)
+    # Floor loop (keep watching new floors until quit). The next floor's
+    # layout is generated in a worker thread while this one is played;
+    # runner stats are only applied when it is handed to Game.
+    with ThreadPoolExecutor(max_workers=1) as pool, RunHistory() as history:
+        next_plan = None
+        while True:
+            floor = progress["runs"] + 1
+            plan = next_plan.result() if next_plan else None
+            next_plan = pool.submit(plan_floor, floor + 1,
+                                    random.Random(random.getrandbits(64)))
+            recorder = _recorder_for(args.record, floor) if args.record else None
+            keep_going = run_floor(progress, render_process=args.render_process,
+                                   fps=args.fps, plan=plan, recorder=recorder, resume=resume,
+                                   history=history, tracer=tracer)
+            resume = None
+            save_progress(progress)
+            if not keep_going:
+                print("\nProgress saved. Goodbye!")
+                break
+            # Between floors: auto-upgrade again
+            apply_auto_upgrades(progress)
+            max_hp, atk, df, regen = derived_stats(progress)
+            print("\n--- Floor complete ---")
+            print(f"Total runs: {progress['runs']}")
+            print(f"Banked gold (after auto-upgrades): {progress['bank_gold']}")
+            print(f"Stats: HP {max_hp} ATK {atk} DEF {df} Regen {regen:.2f}/tick")
+            print("Next floor starts in 3 seconds... (press Ctrl+C to exit)")
+            time.sleep(3)
 
 if __name__ == "__main__":
     try:
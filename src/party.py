@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# Parties: several runners playing one shared floor, e.g. to compare
+# upgrade policies on an identical layout.
+# Usage: python -m src.party --policy plan,ratio --bank 400 --seed 1 [--watch]
+
+import argparse
+import copy
+import random
+import time
+from src.config import TICK_SPEEDS
+from src.game import Game, plan_floor
+from src.progress import DEFAULT_PROGRESS, apply_auto_upgrades
+from src.sim import MAX_TICKS
+
+
+class Party:
+    """Runners on the same floor. The FloorPlan (grid, room graph, FOV and
+    distance-field caches) is built once and shared; each runner is a Game
+    holding only its own position, stats, items, monsters and fog, so an
+    extra runner costs about as much as the floor's items.
+
+    Every runner rolls gold and fights from its own random.Random, all
+    seeded with `seed`, so runners play on common random numbers: what
+    one of them gets doesn't depend on how many rolls the others made."""
+
+    def __init__(self, progresses, names=None, plan=None, seed=None):
+        floors = {p["runs"] + 1 for p in progresses}
+        if len(floors) != 1:
+            raise ValueError(f"party runners are on different floors: {sorted(floors)}")
+        self.plan = plan or plan_floor(floors.pop())
+        if self.plan.chunks is not None:
+            raise ValueError("lazily generated floors can't be shared by a party")
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.games = [Game(p, plan=self.plan, rng=random.Random(seed)) for p in progresses]
+        self.names = names or [f"runner {i + 1}" for i in range(len(self.games))]
+
+    def tick(self):
+        """Tick every runner still on the floor."""
+        for game in self.games:
+            if not game.is_over():
+                game.tick()
+
+    def is_over(self):
+        return all(game.is_over() for game in self.games)
+
+    def summaries(self):
+        return [dict(game.summary(), name=name) for name, game in zip(self.names, self.games)]
+
+
+def play(party, max_ticks=MAX_TICKS, watch=False):
+    """Tick `party` until every runner is done or `max_ticks` have passed;
+    with `watch`, draw each tick in a tiled view."""
+    if watch:
+        from src.render import draw_party
+    for _ in range(max_ticks):
+        if party.is_over():
+            break
+        party.tick()
+        if watch:
+            draw_party(party)
+            time.sleep(TICK_SPEEDS[party.games[0].speed_mode])
+    if watch:
+        draw_party(party)
+    return party.summaries()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Play several runners on one shared floor.")
+    ap.add_argument("--policy", default="plan,ratio",
+                    help="comma-separated auto-upgrade policy of each runner")
+    ap.add_argument("--bank", type=int, default=0, help="gold each runner starts with")
+    ap.add_argument("--floor", type=int, default=1, help="floor number to play")
+    ap.add_argument("--seed", type=int, default=0, help="seed of the floor and the fights")
+    ap.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="tick limit")
+    ap.add_argument("--watch", action="store_true", help="draw the runners side by side")
+    args = ap.parse_args(argv)
+
+    random.seed(args.seed)
+    progresses, names = [], []
+    for policy in args.policy.split(","):
+        progress = copy.deepcopy(DEFAULT_PROGRESS)
+        progress["bank_gold"], progress["runs"] = args.bank, args.floor - 1
+        apply_auto_upgrades(progress, policy)
+        progresses.append(progress)
+        names.append(policy)
+    party = Party(progresses, names, seed=args.seed)
+    for res in play(party, args.max_ticks, args.watch):
+        result = "stuck" if res["result"] == "running" else res["result"]
+        print(f"{res['name']}: {result}  ticks {res['ticks']}  gold {res['gold']}  "
+              f"kills {res['kills']}  hp {res['hp']}/{res['max_hp']}  "
+              f"atk {res['atk']}  def {res['df']}  regen {res['regen']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
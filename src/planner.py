@@ -0,0 +1,139 @@
+# Upgrade planner: choose how to spend banked gold so the runner is most
+# likely to survive the coming floors.
+#
+# A stat line is scored by the expected number of floors the runner gets
+# through in a row. A floor is FIGHTS_PER_FLOOR fights against its typical
+# monster (plus its boss on boss floors), each started at full health (the
+# runner rests, drinks potions and walks around fights it would likely
+# lose), with exact win odds from src.combat. Purchases are searched as a
+# split of the bank between the stats: every split into GRANULES equal
+# parts first, then the best one is refined by moving gold between stats in
+# halving steps. That is a couple of hundred scorings however big the bank
+# is, each a handful of lru_cached combat.outcome calls, and whole plans
+# are memoized per (bank, upgrades, floor) and the monster-scaling and
+# combat tunables in effect.
+
+from functools import lru_cache
+from itertools import combinations
+from src import combat, game
+from src import progress as prog
+from src.combat import hit_damage, outcome
+from src.game import boss_stats, typical_monster
+
+STATS = ("hp", "atk", "def", "regen")
+HORIZON = 20          # at most this many floors are scored ahead
+FIGHTS_PER_FLOOR = 5  # regular fights the runner is assumed to take per floor
+GRANULES = 6          # the coarse search splits the bank into this many parts
+PASSES = 2            # refinement passes per step size
+
+
+def win_chance(max_hp, atk, df, regen, monster, crit=None):
+    """P(winning a fight started at full health against `monster`)."""
+    if crit is None:
+        crit = combat.CRIT_CHANCE
+    m_hp, m_atk, m_df = monster
+    rounds = -(-m_hp // hit_damage(atk, m_df)[0])  # the longest the fight can last
+    m_dmg = max(1, m_atk - df)
+    if (rounds - 1) * m_dmg < max_hp or m_dmg <= min(regen, max_hp - 1):
+        return 1.0  # survives even that without regenerating, or heals every hit
+    regen = min(regen, max_hp)  # same fight either way; keeps hp_track's loop short
+    return outcome(max_hp, max_hp, regen, 0.0, atk, df, m_hp, m_atk, m_df, crit).win
+
+
+def floor_survival(max_hp, atk, df, regen, floor, crit=None):
+    """P(surviving `floor`)."""
+    p = win_chance(max_hp, atk, df, regen, typical_monster(floor), crit) ** FIGHTS_PER_FLOOR
+    if floor % 5 == 0 and p > 0.0:
+        p *= win_chance(max_hp, atk, df, regen, boss_stats(floor), crit)
+    return p
+
+
+def _tunables():
+    """Globals the scores depend on besides their arguments. They go into
+    the cache keys, since src.balance changes them between tasks."""
+    return game.FLOOR_SCALING, combat.CRIT_CHANCE, FIGHTS_PER_FLOOR, HORIZON
+
+
+def score(stats, floor):
+    """Expected number of floors survived in a row from `floor` on, with
+    (max_hp, atk, df, regen) `stats` and full HP at the start of each."""
+    return _score(stats, floor, _tunables())
+
+
+@lru_cache(maxsize=65536)
+def _score(stats, floor, tunables):
+    max_hp, atk, df, regen = stats
+    crit = tunables[1]
+    total = alive = 1.0
+    for f in range(floor, floor + HORIZON):
+        alive *= floor_survival(max_hp, atk, df, regen, f, crit)
+        total += alive
+        if alive < 1e-4:
+            break
+    return total - 1.0
+
+
+def plan_upgrades(bank, upgrades, floor, base=None):
+    """{stat: count} of upgrades to buy with `bank` gold for a runner about
+    to play `floor` with `upgrades` already bought."""
+    base = base or prog.DEFAULT_PROGRESS["base"]
+    counts = _plan(bank, tuple(upgrades[s] for s in STATS), floor,
+                   (base["max_hp"], base["atk"], base["def"], base["regen"]),
+                   tuple(prog.UPGRADE_COSTS[s] for s in STATS),
+                   tuple(prog.UPGRADE_EFFECT[s] for s in STATS), _tunables())
+    return dict(zip(STATS, counts))
+
+
+@lru_cache(maxsize=1024)
+def _plan(bank, owned, floor, base, costs, effects, tunables):
+    def stats(counts):
+        hp, atk, df, regen = (b + (o + n) * e
+                              for b, o, n, e in zip(base, owned, counts, effects))
+        return int(hp), int(atk), int(df), round(regen, 9)
+
+    def value(alloc):
+        return _score(stats([a // c for a, c in zip(alloc, costs)]), floor, tunables)
+
+    if bank < min(costs):
+        return (0,) * len(STATS)
+
+    # Coarse: every split of the bank into GRANULES parts (stars and bars)
+    k = len(STATS)
+    best, best_val = None, None
+    for bars in combinations(range(GRANULES + k - 1), k - 1):
+        parts = [b - a - 1 for a, b in zip((-1,) + bars, bars + (GRANULES + k - 1,))]
+        alloc = tuple(bank * p // GRANULES for p in parts)
+        v = value(alloc)
+        if best_val is None or v > best_val:
+            best, best_val = alloc, v
+
+    # Refine: move `step` gold between two stats while that helps
+    step = bank // (2 * GRANULES)
+    while step >= min(costs):
+        improved = True
+        for _ in range(PASSES):
+            if not improved:
+                break
+            improved = False
+            for i in range(k):
+                for j in range(k):
+                    if i == j or best[j] < step:
+                        continue
+                    alloc = list(best)
+                    alloc[i] += step
+                    alloc[j] -= step
+                    v = value(alloc)
+                    if v > best_val:
+                        best, best_val, improved = tuple(alloc), v, True
+        step //= 2
+
+    # Spend what the split left over, best single upgrade at a time
+    counts = [a // c for a, c in zip(best, costs)]
+    left = bank - sum(n * c for n, c in zip(counts, costs))
+    while left >= min(costs):
+        options = [i for i in range(k) if costs[i] <= left]
+        i = max(options, key=lambda i: _score(stats(
+            [n + (j == i) for j, n in enumerate(counts)]), floor, tunables))
+        counts[i] += 1
+        left -= costs[i]
+    return tuple(counts)
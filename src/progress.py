@@ -1,7 +1,8 @@
-import json
+import copy
 import os
+from src import store
 
-PROGRESS_FILE = "progress.json"
+PROGRESS_FILE = "progress.json"  # legacy location, migrated into store.DB_FILE
 DEFAULT_PROGRESS = {
     "runs": 0,
     "bank_gold": 0,
@@ -12,25 +13,42 @@ DEFAULT_PROGRESS = {
 UPGRADE_COSTS = {"hp": 20, "atk": 30, "def": 30, "regen": 40}
 UPGRADE_EFFECT = {"hp": 6, "atk": 1, "def": 1, "regen": 0.10}
 AUTO_SPEND_RATIO = {"hp": 0.5, "atk": 0.3, "def": 0.2, "regen": 0.0}
+AUTO_UPGRADE_POLICY = "plan"  # "plan": src.planner; "ratio": split by AUTO_SPEND_RATIO
+POLICY_TUNABLES = {"plan": (), "ratio": ("AUTO_SPEND_RATIO",)}  # read by that policy only
 
 def load_progress():
-    if os.path.exists(PROGRESS_FILE):
-        try:
-            with open(PROGRESS_FILE, "r") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return DEFAULT_PROGRESS.copy()
+    try:
+        progress = store.read_progress(legacy=PROGRESS_FILE)
+    except store.sqlite3.DatabaseError:
+        progress = None
+    return progress if progress is not None else copy.deepcopy(DEFAULT_PROGRESS)
+
+def atomic_write(path, data):
+    """Replace `path` with `data` (bytes) so readers only ever see the old
+    or the new contents: write a temp file, fsync it, then rename."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
 def save_progress(p):
-    with open(PROGRESS_FILE, "w") as f:
-        json.dump(p, f, indent=2)
+    store.write_progress(p)
 
-def apply_auto_upgrades(progress):
-    # Spend banked gold according to AUTO_SPEND_RATIO
+def apply_auto_upgrades(progress, policy=None):
+    # Spend banked gold with the planner, or according to AUTO_SPEND_RATIO
     bank = progress["bank_gold"]
     if bank <= 0:
         return
+    if (policy or AUTO_UPGRADE_POLICY) == "plan":
+        from src.planner import plan_upgrades  # planner imports game, which imports us
+        plan = plan_upgrades(bank, progress["upgrades"], progress["runs"] + 1, progress["base"])
+        for stat, n in plan.items():
+            progress["upgrades"][stat] += n
+            bank -= n * UPGRADE_COSTS[stat]
+        progress["bank_gold"] = bank
+        return
     # Compute target buckets
     targets = {k: int(bank * r) for k, r in AUTO_SPEND_RATIO.items()}
     # Spend in round-robin order until gold exhausted or no purchases possible
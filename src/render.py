@@ -1,5 +1,7 @@
 # src/render.py
 
+import math
+import shutil
 import sys
 from src.colors import (
     RESET, BOLD, DIM,
@@ -74,7 +76,7 @@ def hp_bar(current, maximum, width=20):
 
 # ----------------------------- HUD ---------------------------------------
 
-def draw_hud(game):
+def hud_lines(game):
     p = game.player
     upgrades = game.progress["upgrades"]
 
@@ -105,93 +107,299 @@ def draw_hud(game):
         f"Regen+{mag(upgrades['regen'])}"
     )
 
-    controls = "Controls: P pause/resume | 1/2/3 speed | Q quit"
+    controls = "Controls: P pause/resume | 1/2/3/4 speed (4 = max) | Q quit"
 
-    print(status)
-    print(stats)
-    print(up_text)
-    print(controls)
+    lines = [status, stats, up_text, controls]
+    tracer = getattr(game, "tracer", None)
+    if tracer is not None and tracer.overlay:
+        lines.append(DIM + tracer.overlay_line() + RESET)
+    return lines
 
-def draw_event_log(game):
-    print("\nEvents:")
-    for entry in game.log:
-        print("  " + entry)
+LOG_LINES = 5  # event log area is padded to a fixed height so the map never shifts
+
+def event_log_lines(game):
+    entries = ["  " + entry for entry in game.log[-LOG_LINES:]]
+    return ["", "Events:"] + entries + [""] * (LOG_LINES - len(entries))
 
 
 # ----------------------------- FOOTER ------------------------------------
 
-def draw_footer(game):
+def footer_lines(game):
     res = game.result()
     if res == "running":
-        print("\nWatching the runner...")
+        return ["", "Watching the runner..."]
     elif res == "dead":
-        print("\n💀 The runner died!")
+        return ["", "💀 The runner died!"]
     elif res == "escaped":
-        print("\n🚪 The runner escaped! Gold banked.")
+        return ["", "🚪 The runner escaped! Gold banked."]
+    return ["", ""]
 
 
-# ----------------------------- GRID RENDER --------------------------------
+# ----------------------------- FRAME BUFFER --------------------------------
 
-def draw_grid(grid):
-    for row in grid:
-        print("".join(row))
+def _goto(row, col):
+    return f"\033[{row};{col}H"
 
+# ----------------------------- VIEWPORT ------------------------------------
 
-# ----------------------------- MAIN DRAW ---------------------------------
+# The view never shrinks below this, so the default 60x24 map always shows
+# whole; bigger maps scroll with the runner.
+MIN_VIEW = (60, 24)
 
-def draw(game):
-    clear_screen()
-
-    # Build fog-aware grid
-    fog_grid = []
-    for y, row in enumerate(game.grid):
-        fog_row = []
-        for x, ch in enumerate(row):
-            visible = (x, y) in game.visible
-            explored = (x, y) in game.explored
-            fog_row.append([ch, visible, explored, False])  # flash=False for now
-        fog_grid.append(fog_row)
-
-    # Overlay items
-    for (x, y) in game.coins:
-        fog_grid[y][x][0] = COIN
-    for (x, y) in game.potions:
-        fog_grid[y][x][0] = POTION
-
-    # Monsters
-    for (x, y), mon in game.monsters.items():
-        if getattr(mon, "is_boss", False):
-            fog_grid[y][x][0] = BOSS
-        else:
-            fog_grid[y][x][0] = MONSTER
-        fog_grid[y][x][3] = mon.flash > 0
-
-    # Exit
-    ex, ey = game.exit
-    fog_grid[ey][ex][0] = EXIT
-
-    # Player
+def viewport(game, size=None, min_view=MIN_VIEW):
+    """(x0, y0, w, h) of the part of the map to draw: as much as fits in
+    the terminal (or `size` columns x rows) around the HUD, but at least
+    `min_view`, centred on the player and clamped to the map edges."""
+    if size is None:
+        cols, rows = shutil.get_terminal_size()
+        tracer = getattr(game, "tracer", None)
+        hud = 4 + (tracer is not None and tracer.overlay)
+        size = (cols, rows - hud - (LOG_LINES + 2) - 3)  # HUD, log, footer, cursor
+    gw, gh = game.grid.w, game.grid.h
+    vw = min(gw, max(min_view[0], size[0]))
+    vh = min(gh, max(min_view[1], size[1]))
     px, py = game.player.x, game.player.y
-    fog_grid[py][px][0] = PLAYER
-    fog_grid[py][px][3] = game.player.flash > 0
+    x0 = min(max(px - vw // 2, 0), gw - vw)
+    y0 = min(max(py - vh // 2, 0), gh - vh)
+    return x0, y0, vw, vh
+
+
+# Per-cell fog state in the frame buffer
+UNSEEN, EXPLORED, VISIBLE, FLASHING = 0, 1, 2, 3
+
+class FrameRenderer:
+    """Differential renderer: keeps the previous frame and emits only the
+    text lines and map cells that changed, positioned with cursor escapes,
+    in one write per frame.
+
+    Only the viewport() around the player is drawn, kept as two flat byte
+    buffers (glyph and fog state per cell); rows are compared as bytes and
+    only rows that differ are diffed cell by cell and colorized. So the
+    cost of a frame depends on the terminal size, not the map size.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget the previous frame; the next one clears and repaints all."""
+        self.prev_text = None
+        self.prev_rows = None
+        self.game = None
+        self.explored = None
+        self.seen = 0  # how much of game.explored_order the mask holds
+
+    def _fog(self, game, x0, y0, vw, vh):
+        n = len(game.grid.cells)
+        w = game.grid.w
+        order = getattr(game, "explored_order", None)
+        if game is not self.game or self.explored is None or len(self.explored) != n:
+            # New floor (or game): rebuild the explored mask from scratch
+            self.game = game
+            self.explored = bytearray(n)
+            for (x, y) in game.explored:
+                self.explored[y*w + x] = EXPLORED
+        elif order is not None:
+            # Tiles explored on ticks that weren't drawn
+            for (x, y) in order[self.seen:]:
+                self.explored[y*w + x] = EXPLORED
+        self.seen = len(order) if order is not None else 0
+        fog = bytearray()
+        for y in range(y0, y0 + vh):
+            fog += self.explored[y*w + x0:y*w + x0 + vw]
+        # Everything visible is explored from now on
+        for (x, y) in game.visible:
+            self.explored[y*w + x] = EXPLORED
+            if x0 <= x < x0 + vw and y0 <= y < y0 + vh:
+                fog[(y - y0)*vw + x - x0] = VISIBLE
+        return fog
+
+    def frame(self, game):
+        """Return the escape sequence that turns the last frame into this one."""
+        x0, y0, w, h = viewport(game)
+        glyphs, fog = self._view(game, x0, y0, w, h)
+
+        top = hud_lines(game) + event_log_lines(game)
+        bottom = footer_lines(game)
+        text = top + [None] * h + bottom
+        rows = [bytes(glyphs[y*w:(y+1)*w] + fog[y*w:(y+1)*w]) for y in range(h)]
+
+        out = []
+        full = self.prev_text is None or len(self.prev_text) != len(text) \
+            or len(self.prev_rows) != h or len(self.prev_rows[0]) != 2*w
+        if full:
+            out.append("\033[2J")
+        for r, line in enumerate(text):
+            if line is not None and (full or line != self.prev_text[r]):
+                out.append(_goto(r + 1, 1) + line + "\033[K")
+        for y, row in enumerate(rows):
+            prev = None if full else self.prev_rows[y]
+            if row == prev:
+                continue
+            out.append(self._diff_row(len(top) + y + 1, row, prev, w))
+        out.append(_goto(len(text) + 1, 1))
+
+        self.prev_text, self.prev_rows = text, rows
+        return "".join(out)
+
+    def _view(self, game, x0, y0, w, h):
+        """Glyph and fog buffers of a w x h view from (x0, y0), with the
+        items, monsters, exit and player drawn over the map."""
+        grid = game.grid
+        x1, y1 = x0 + w, y0 + h
+        gw, cells = grid.w, grid.cells
+        glyphs = bytearray()
+        for y in range(y0, y1):
+            glyphs += cells[y*gw + x0:y*gw + x1]
+        fog = self._fog(game, x0, y0, w, h)
+        for (x, y), _ in game.coins.in_rect(x0, y0, x1, y1):
+            glyphs[(y - y0)*w + x - x0] = ord(COIN)
+        for (x, y), _ in game.potions.in_rect(x0, y0, x1, y1):
+            glyphs[(y - y0)*w + x - x0] = ord(POTION)
+        for (x, y), mon in game.monsters.in_rect(x0, y0, x1, y1):
+            i = (y - y0)*w + x - x0
+            glyphs[i] = ord(BOSS if mon.is_boss else MONSTER)
+            if mon.flash > 0 and fog[i] == VISIBLE:
+                fog[i] = FLASHING
+        ex, ey = game.exit
+        if x0 <= ex < x1 and y0 <= ey < y1:
+            # the floor's grid is shared: whether this runner has unlocked it is not in there
+            locked = getattr(game, "exit_locked", False)
+            glyphs[(ey - y0)*w + ex - x0] = ord(LOCKED_EXIT if locked else EXIT)
+        i = (game.player.y - y0)*w + game.player.x - x0
+        glyphs[i] = ord(PLAYER)
+        if game.player.flash > 0 and fog[i] == VISIBLE:
+            fog[i] = FLASHING
+        return glyphs, fog
+
+    @staticmethod
+    def _diff_row(screen_row, row, prev, w):
+        """Repaint the changed cells of one map row as runs. Runs separated by
+        a gap of a few cells are merged: rewriting them is cheaper than
+        another cursor escape."""
+        out = []
+        x = 0
+        while x < w:
+            if prev is not None and row[x] == prev[x] and row[w+x] == prev[w+x]:
+                x += 1
+                continue
+            start = end = x
+            while x < w and (x - end) <= 3:
+                if prev is None or row[x] != prev[x] or row[w+x] != prev[w+x]:
+                    end = x
+                x += 1
+            cells = []
+            for cx in range(start, end + 1):
+                f = row[w+cx]
+                cells.append(colorize_tile(chr(row[cx]), f >= VISIBLE, f >= EXPLORED,
+                                           f == FLASHING))
+            out.append(_goto(screen_row, start + 1) + "".join(cells))
+            x = end + 1
+        return "".join(out)
+
+
+class TiledRenderer:
+    """Several runners at once, each in its own pane: a one-line header
+    and a view centred on that runner, panes laid out in a near-square
+    grid. Each pane keeps its runner's fog in a FrameRenderer; screen lines
+    are compared as glyph/fog bytes and only changed lines are redrawn."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.panes = []
+        self.prev = None
+
+    def frame(self, games, names, size=None):
+        if size is None:
+            cols, rows = shutil.get_terminal_size()
+            size = (cols, rows - 3)  # title, controls, cursor
+        ncols = math.ceil(math.sqrt(len(games)))
+        nrows = -(-len(games) // ncols)
+        pw = max(1, (size[0] - (ncols - 1)) // ncols)  # a column between panes
+        ph = max(1, size[1] // nrows - 1)               # each pane has a header
+        if len(self.panes) != len(games):
+            self.panes = [FrameRenderer() for _ in games]
+
+        first = games[0]
+        lines = [
+            f"Idle Roguelite party  |  Floor {cyan(first.floor)}  |  "
+            f"Speed: {yellow(first.speed_mode)} {red('(PAUSED)') if first.paused else ''}",
+            "Controls: Ctrl+C quit",
+        ]
+        for r in range(nrows):
+            row = list(range(r * ncols, min(len(games), (r + 1) * ncols)))
+            heads, views = [], []
+            for k in row:
+                game, p = games[k], games[k].player
+                heads.append(f"{names[k]}: HP {max(0, p.hp)}/{p.max_hp} gold {p.gold} "
+                             f"kills {p.kills} {game.result()}"[:pw].ljust(pw))
+                x0, y0, w, h = viewport(game, (pw, ph), min_view=(1, 1))
+                glyphs, fog = self.panes[k]._view(game, x0, y0, w, h)
+                views.append((glyphs, fog, w, h))
+            lines.append(BOLD + " ".join(heads) + RESET)
+            for y in range(ph):
+                line = []
+                for glyphs, fog, w, h in views:
+                    if y < h:
+                        line.append((bytes(glyphs[y*w:(y+1)*w]).ljust(pw),
+                                     bytes(fog[y*w:(y+1)*w]).ljust(pw, b"\0")))
+                    else:
+                        line.append((b" " * pw, bytes(pw)))
+                lines.append(tuple(line))
 
-    # Convert fog grid to colored strings
-    colored_grid = []
-    for row in fog_grid:
         out = []
-        for ch, visible, explored, flash in row:
-            out.append(colorize_tile(ch, visible, explored, flash))
-        colored_grid.append(out)
+        full = self.prev is None or len(self.prev) != len(lines)
+        if full:
+            out.append("\033[2J")
+        for r, line in enumerate(lines):
+            if not full and line == self.prev[r]:
+                continue
+            if isinstance(line, tuple):
+                line = " ".join("".join(
+                    colorize_tile(chr(g), f >= VISIBLE, f >= EXPLORED, f == FLASHING)
+                    for g, f in zip(glyphs, fog)) for glyphs, fog in line)
+            out.append(_goto(r + 1, 1) + line + "\033[K")
+        out.append(_goto(len(lines) + 1, 1))
+        self.prev = lines
+        return "".join(out)
+
 
-    # Draw everything
-    draw_hud(game)
-    draw_event_log(game)
-    draw_grid(colored_grid)
-    draw_footer(game)
+_renderer = FrameRenderer()
+_tiled = TiledRenderer()
+
+
+def reset_frame():
+    """Force a full repaint on the next draw (call after printing elsewhere)."""
+    _renderer.reset()
+
+
+# ----------------------------- MAIN DRAW ---------------------------------
 
+def draw(game, out=None):
+    out = out or sys.stdout
+    out.write(_renderer.frame(game))
+    out.flush()
     # Decrement flash AFTER drawing
+    decay_flash(game)
+
+def draw_party(party, out=None):
+    """draw() for a src.party.Party: every runner in a tiled view."""
+    out = out or sys.stdout
+    out.write(_tiled.frame(party.games, party.names))
+    out.flush()
+    for game in party.games:
+        decay_flash(game)
+
+def decay_flash(game):
+    """Count down damage flashes by one frame."""
     if game.player.flash > 0:
         game.player.flash -= 1
+    table = getattr(game, "monster_table", None)
+    if table is not None:
+        table.decay_flash()  # whole column at once
+        return
     for mon in game.monsters.values():
         if mon.flash > 0:
             mon.flash -= 1
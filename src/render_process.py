@@ -0,0 +1,218 @@
+# Optional out-of-process rendering. The simulation publishes compact
+# snapshots of the game into a multiprocessing.shared_memory buffer; a
+# renderer process draws the latest one at its own frame rate and simply
+# skips any snapshots published in between, so a slow terminal never
+# blocks the simulation.
+
+import marshal
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+from src.dungeon.grid import Grid
+from src.dungeon.spatial import SpatialIndex
+from src.render import draw, decay_flash, reset_frame, viewport
+
+# Header: sequence number (odd while a snapshot is being written),
+# payload length, closed flag.
+HEADER = struct.Struct("<QI?")
+SNAPSHOT_VERSION = 3
+DEFAULT_FPS = 30
+
+# Fog byte per tile in a snapshot
+_EXPLORED, _VISIBLE = 1, 2
+
+
+def snapshot(game):
+    """Encode what the renderer needs from `game` as bytes. Only the
+    viewport is sent, shifted so the view starts at (0, 0)."""
+    x0, y0, w, h = viewport(game)
+    x1, y1 = x0 + w, y0 + h
+    gw, cells = game.grid.w, game.grid.cells
+    explored = game.explored
+    view = bytearray()
+    fog = bytearray()
+    for y in range(y0, y1):
+        view += cells[y*gw + x0:y*gw + x1]
+        fog += bytes(_EXPLORED if (x, y) in explored else 0 for x in range(x0, x1))
+    for (x, y) in game.visible:
+        if x0 <= x < x1 and y0 <= y < y1:
+            fog[(y - y0)*w + x - x0] = _VISIBLE
+    p = game.player
+    shift = lambda x, y: (y - y0)*w + x - x0
+    return marshal.dumps((
+        SNAPSHOT_VERSION, w, h, bytes(view), bytes(fog),
+        [shift(*pos) for pos, _ in game.coins.in_rect(x0, y0, x1, y1)],
+        [shift(*pos) for pos, _ in game.potions.in_rect(x0, y0, x1, y1)],
+        [(shift(*pos), m.is_boss, m.flash)
+         for pos, m in game.monsters.in_rect(x0, y0, x1, y1)],
+        (game.exit[0] - x0, game.exit[1] - y0),  # may lie outside the view
+        game.exit_locked,
+        (p.x - x0, p.y - y0, p.hp, p.max_hp, p.atk, p.df, p.regen, p.gold, p.kills, p.flash),
+        game.floor, game.speed_mode, game.paused, list(game.log),
+        dict(game.progress["upgrades"]), game.result(),
+    ))
+
+
+class _Entity:
+    """Bare attribute holder for snapshot entities."""
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+
+class GameView:
+    """Read-only stand-in for Game rebuilt from a snapshot; has exactly the
+    attributes render.draw() reads."""
+
+    def __init__(self, data):
+        (version, w, h, cells, fog, coins, potions, monsters, exit_, self.exit_locked,
+         player, self.floor, self.speed_mode, self.paused, self.log, upgrades,
+         self._result) = marshal.loads(data)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+        self.grid = Grid(w, h)
+        self.grid.cells[:] = cells
+        self.explored = {(i % w, i // w) for i, f in enumerate(fog) if f}
+        self.visible = {(i % w, i // w) for i, f in enumerate(fog) if f == _VISIBLE}
+        self.coins = SpatialIndex((i % w, i // w) for i in coins)
+        self.potions = SpatialIndex((i % w, i // w) for i in potions)
+        self.monsters = SpatialIndex({(i % w, i // w): _Entity(is_boss=b, flash=f)
+                                      for i, b, f in monsters})
+        self.exit = tuple(exit_)
+        x, y, hp, max_hp, atk, df, regen, gold, kills, flash = player
+        self.player = _Entity(x=x, y=y, hp=hp, max_hp=max_hp, atk=atk, df=df,
+                              regen=regen, gold=gold, kills=kills, flash=flash)
+        self.progress = {"upgrades": upgrades}
+
+    def result(self):
+        return self._result
+
+
+class FrameBuffer:
+    """Single-slot shared-memory frame buffer guarded by a sequence lock.
+
+    The writer bumps the sequence to an odd value, writes the payload and
+    its length, then bumps the sequence to even (rewriting the same
+    length). A reader copies the payload and accepts it only if the
+    sequence was even and the whole header unchanged across the copy.
+    """
+
+    def __init__(self, capacity=None, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=HEADER.size + capacity)
+            HEADER.pack_into(self.shm.buf, 0, 0, 0, False)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.capacity = self.shm.size - HEADER.size
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, payload):
+        if len(payload) > self.capacity:
+            raise ValueError(f"snapshot of {len(payload)} bytes exceeds frame buffer")
+        seq, _, closed = HEADER.unpack_from(self.shm.buf, 0)
+        HEADER.pack_into(self.shm.buf, 0, seq + 1, 0, closed)
+        self.shm.buf[HEADER.size:HEADER.size + len(payload)] = payload
+        # length first, under the odd sequence, so no even header pairs the
+        # new sequence with an old length
+        HEADER.pack_into(self.shm.buf, 0, seq + 1, len(payload), closed)
+        HEADER.pack_into(self.shm.buf, 0, seq + 2, len(payload), closed)
+
+    def read(self, last_seq=None):
+        """Return (seq, payload) for the latest complete snapshot, or
+        (last_seq, None) if nothing new has been published."""
+        while True:
+            header = HEADER.unpack_from(self.shm.buf, 0)
+            seq, length, _ = header
+            if seq == last_seq or seq == 0:
+                return last_seq, None
+            if seq % 2:
+                time.sleep(0)  # writer mid-update
+                continue
+            payload = bytes(self.shm.buf[HEADER.size:HEADER.size + length])
+            if HEADER.unpack_from(self.shm.buf, 0)[:2] == header[:2]:
+                return seq, payload
+
+    @property
+    def closed(self):
+        return HEADER.unpack_from(self.shm.buf, 0)[2]
+
+    def close(self):
+        if self.owner:
+            seq, length, _ = HEADER.unpack_from(self.shm.buf, 0)
+            HEADER.pack_into(self.shm.buf, 0, seq, length, True)
+
+    def release(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def render_loop(name, fps=DEFAULT_FPS):
+    """Renderer process body: draw the newest snapshot every 1/fps seconds
+    until the writer closes the buffer."""
+    fb = FrameBuffer(name=name)
+    try:
+        # The creating process owns cleanup; don't let this one's resource
+        # tracker unlink the segment when it exits.
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(fb.shm._name, "shared_memory")
+    except Exception:
+        pass
+    reset_frame()
+    seq = None
+    interval = 1.0 / fps
+    try:
+        while True:
+            start = time.monotonic()
+            closed = fb.closed
+            seq, payload = fb.read(seq)
+            if payload is not None:
+                draw(GameView(payload))
+            if closed:
+                break
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
+    finally:
+        fb.shm.close()
+
+
+class RenderProcess:
+    """Simulation-side handle: owns the frame buffer and the renderer process.
+
+    publish() is cheap to call every tick: it encodes a snapshot at most
+    `fps` times per second, and flashes are decayed here because the
+    renderer only ever sees copies.
+    """
+
+    def __init__(self, fps=DEFAULT_FPS, capacity=1 << 20):
+        self.fps = fps
+        self.fb = FrameBuffer(capacity=capacity)
+        self.last = 0.0
+        self.proc = multiprocessing.Process(target=render_loop, args=(self.fb.name, fps),
+                                            daemon=True)
+        self.proc.start()
+
+    def publish(self, game, force=False):
+        now = time.monotonic()
+        if not force and now - self.last < 1.0 / self.fps:
+            return
+        self.last = now
+        self.fb.write(snapshot(game))
+        decay_flash(game)
+
+    def close(self):
+        self.fb.close()
+        self.proc.join(timeout=2)
+        if self.proc.is_alive():
+            self.proc.terminate()
+        self.fb.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
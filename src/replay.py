@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# Deterministic floor replays. A replay file is a stream of pickled records:
+#
+#   ("header", {...})          version, seed, tunables, snapshot interval
+#   ("snap", tick, bytes)      src.savestate encoding of the game every N ticks
+#   ("key", tick, key)         pause/speed key applied after `tick` ticks
+#   ("end", tick, result)      written when the floor ends or the game quits
+#
+# Everything random in a tick comes from the global `random` module, so a
+# snapshot plus the keys after it reproduce the floor exactly. Seeking
+# restores the nearest snapshot at or before the target and fast-forwards
+# headlessly, so it never runs more than `snapshot_every` ticks.
+#
+#   python -m src.replay runs/1712345678-floor3.replay --tick 1200
+#   python -m src.replay runs/1712345678-floor3.replay --verify
+
+import argparse
+import bisect
+import pickle
+import random
+import time
+import zlib
+from src import config, savestate
+from src.balance import apply_overrides
+
+REPLAY_VERSION = 2
+SNAPSHOT_EVERY = 250  # ticks between snapshots; bounds the cost of a seek
+
+
+def tunables():
+    """Current values of the src.config tunables, recorded in the header."""
+    return {name: getattr(config, name) for name in dir(config) if name.isupper()}
+
+
+def capture(game):
+    """Snapshot of the game, its RNG state included."""
+    return zlib.compress(savestate.dumps(game), 1)
+
+
+def restore(data):
+    """Inverse of capture(): return the game with its RNG restored."""
+    return savestate.loads(zlib.decompress(data))
+
+
+class Recorder:
+    """Writes a replay of one floor. Attach with start(game); Game calls
+    on_tick() and record_key() itself while `game.recorder` is set."""
+
+    def __init__(self, path, seed=None, snapshot_every=SNAPSHOT_EVERY):
+        self.path = path
+        self.seed = seed
+        self.snapshot_every = snapshot_every
+        self.file = None
+
+    def _write(self, record):
+        pickle.dump(record, self.file, pickle.HIGHEST_PROTOCOL)
+
+    def start(self, game):
+        self.file = open(self.path, "wb")
+        self._write(("header", {
+            "version": REPLAY_VERSION,
+            "seed": self.seed,
+            "floor": game.floor,
+            "config": tunables(),
+            "snapshot_every": self.snapshot_every,
+            "created": time.time(),
+        }))
+        self._write(("snap", game.ticks, capture(game)))
+        game.recorder = self
+
+    def record_key(self, game, key):
+        self._write(("key", game.ticks, key))
+
+    def on_tick(self, game):
+        if game.ticks % self.snapshot_every == 0:
+            self._write(("snap", game.ticks, capture(game)))
+            self.file.flush()  # a crash loses at most one interval of keys
+
+    def close(self, game):
+        if self.file is None:
+            return
+        self._write(("end", game.ticks, game.result()))
+        self.file.close()
+        self.file = None
+        game.recorder = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class Replay:
+    """A loaded replay file; seek(tick) rebuilds the Game at any tick."""
+
+    def __init__(self, path):
+        self.header = None
+        self.snap_ticks = []
+        self.snaps = []
+        self.keys = {}  # tick -> keys applied before the next tick
+        self.end_tick = 0
+        self.result = None
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    record = pickle.load(f)
+                except EOFError:
+                    break
+                except pickle.UnpicklingError:
+                    break  # truncated by a crash: keep what was flushed
+                kind = record[0]
+                if kind == "header":
+                    self.header = record[1]
+                    if self.header["version"] != REPLAY_VERSION:
+                        raise ValueError(f"unsupported replay version {self.header['version']}")
+                elif kind == "snap":
+                    self.snap_ticks.append(record[1])
+                    self.snaps.append(record[2])
+                elif kind == "key":
+                    self.keys.setdefault(record[1], []).append(record[2])
+                elif kind == "end":
+                    self.result = record[2]
+                self.end_tick = max(self.end_tick, record[1] if kind != "header" else 0)
+        if self.header is None or not self.snaps:
+            raise ValueError(f"{path} is not a replay file")
+
+    def apply_config(self):
+        """Restore the tunables the floor was recorded with."""
+        apply_overrides(self.header["config"])
+
+    def _apply_keys(self, game):
+        for key in self.keys.get(game.ticks, ()):
+            game.apply_input(key)
+
+    def step(self, game):
+        """Advance a replayed game by one tick, applying recorded keys."""
+        game.paused = False  # recorded pauses never span a tick
+        game.tick()
+        self._apply_keys(game)
+
+    def seek(self, tick):
+        """Game state after `tick` ticks (clamped to the recording)."""
+        tick = max(0, min(tick, self.end_tick))
+        i = bisect.bisect_right(self.snap_ticks, tick) - 1
+        game = restore(self.snaps[i])
+        self._apply_keys(game)
+        while game.ticks < tick and not game.is_over():
+            self.step(game)
+        return game
+
+    def verify(self):
+        """Replay from the first snapshot and check every later snapshot
+        is reproduced. Returns the first tick that diverges, or None."""
+        game = self.seek(self.snap_ticks[0])
+        for tick, data in zip(self.snap_ticks[1:], self.snaps[1:]):
+            while game.ticks < tick and not game.is_over():
+                self.step(game)
+            state = random.getstate()
+            expected = restore(data)
+            random.setstate(state)
+            if fingerprint(game) != fingerprint(expected):
+                return tick
+        return None
+
+
+def fingerprint(game):
+    """Comparable summary of the state that decides how a floor plays out."""
+    p = game.player
+    return (game.ticks, (p.x, p.y, p.hp, p.gold, p.kills, round(p._frac, 9)),
+            sorted(game.coins), sorted(game.potions),
+            sorted((pos, m.hp) for pos, m in game.monsters.items()),
+            game.exit_locked, bytes(game.grid.cells))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Inspect or play back a recorded floor.")
+    ap.add_argument("path", help="replay file written by main.py --record")
+    ap.add_argument("--tick", type=int, default=None, help="show the floor at this tick")
+    ap.add_argument("--play", action="store_true", help="play on from --tick in the terminal")
+    ap.add_argument("--speed", type=float, default=0.05, help="seconds per tick when playing")
+    ap.add_argument("--verify", action="store_true",
+                    help="check that replaying reproduces every snapshot")
+    args = ap.parse_args(argv)
+
+    replay = Replay(args.path)
+    replay.apply_config()
+    h = replay.header
+    print(f"floor {h['floor']}  seed {h['seed']}  ticks {replay.end_tick}  "
+          f"result {replay.result or 'unfinished'}  snapshots {len(replay.snaps)}  "
+          f"keys {sum(map(len, replay.keys.values()))}")
+    if args.verify:
+        bad = replay.verify()
+        print("replay is deterministic" if bad is None else f"diverged at tick {bad}")
+        return 1 if bad is not None else 0
+    if args.tick is None and not args.play:
+        return 0
+    from src.render import draw, reset_frame
+    start = time.perf_counter()
+    game = replay.seek(args.tick or 0)
+    seek_ms = (time.perf_counter() - start) * 1000
+    reset_frame()
+    draw(game)
+    if args.play:
+        while game.ticks < replay.end_tick and not game.is_over():
+            replay.step(game)
+            draw(game)
+            time.sleep(args.speed)
+    print(f"\ntick {game.ticks} (seek took {seek_ms:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,236 @@
+# Compact binary save/restore of a whole Game, so a floor can be resumed
+# mid-way and autosaved cheaply.
+#
+# Layout (little-endian): a header (magic, format version, map size)
+# followed by length-prefixed sections:
+#
+#   cells     one byte per tile, Grid.cells as is
+#   visible   one bit per tile
+#   explored  one bit per tile
+#   coins     flat tile indices (uint32) in index order
+#   potions   "
+#   monsters  int32 x 6 per monster: tile, hp, max_hp, atk, df, flash | boss << 8
+#   field     the runner's distance field (int32 per tile), empty if none;
+#             a bounded field on a chunked map is int32 (tile, steps) pairs
+#   path      flat tile indices of the cached path
+#   rng       the 625 words of the game's Mersenne Twister state (game.rng,
+#             the global `random` unless the game has its own)
+#   misc      marshal'd tuple of the small scalar state
+#
+# Sections are raw array/bytes copies, so encoding and decoding are a few
+# memcpys plus one pass over the fog sets.
+
+import marshal
+import os
+import random
+import struct
+import sys
+from array import array
+from itertools import compress, repeat
+from operator import floordiv, mod
+from src.dungeon.chunks import LazyMap
+from src.dungeon.grid import Grid
+from src.dungeon.pathfinding import SparseField
+from src.dungeon.spatial import SpatialIndex
+from src.progress import atomic_write
+
+MAGIC = b"IRSV"
+SAVE_VERSION = 4  # 2: chunked map state appended to misc; 3: rooms; 4: own rng flag
+SAVE_FILE = "savegame.bin"
+HEADER = struct.Struct("<4sHII")
+SECTION = struct.Struct("<I")
+
+_BITS = bytes.maketrans(b"01", b"\x00\x01")
+# Defaults for the misc fields added after version 1, in order
+_MISC_ADDED = (None, None, False, [], False)
+_BOSS = 1 << 8
+
+
+def _arr(typecode, data=b""):
+    a = array(typecode)
+    a.frombytes(data)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+
+def _le(a):
+    if sys.byteorder == "big":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def pack_bits(indices, n):
+    """Bitmap of n bits with the given indices set (bit i of byte i // 8)."""
+    flags = bytearray(b"0") * n
+    for i in indices:
+        flags[i] = 49  # "1"
+    flags.reverse()
+    return int(flags or b"0", 2).to_bytes((n + 7) // 8, "little")
+
+
+def unpack_bits(data, n):
+    """Indices of the set bits of a pack_bits() bitmap."""
+    bits = format(int.from_bytes(data, "little"), f"0{n}b")[::-1]
+    return list(compress(range(n), bits.encode().translate(_BITS)))
+
+
+def _positions(indices, w):
+    """(x, y) for each flat index, built without a Python-level loop."""
+    return zip(map(mod, indices, repeat(w)), map(floordiv, indices, repeat(w)))
+
+
+def dumps(game):
+    """Encode `game`, including the state of its RNG, as bytes."""
+    grid = game.grid
+    w, h = grid.w, grid.h
+    n = w * h
+    p = game.player
+    monsters = array("i")
+    for (x, y), m in game.monsters.items():
+        monsters.extend((y*w + x, m.hp, m.max_hp, m.atk, m.df,
+                         m.flash | (_BOSS if m.is_boss else 0)))
+    version, state, gauss = game.rng.getstate()
+    path = game.path
+    goals = game.field_goals
+    field = game.field
+    sparse = isinstance(field, SparseField)
+    if sparse:
+        pairs = array("i")
+        for item in field.items():
+            pairs.extend(item)
+        field = pairs
+    chunks = game.chunks
+    misc = (
+        game.floor, game.ticks, game.speed_mode, game.paused, game.exit,
+        game.exit_locked, game.death_cause, game.instant_combat,
+        game.avoid_losing_fights, list(game.log), game.progress,
+        (p.x, p.y, p.hp, p.max_hp, p.atk, p.df, p.regen, p._frac,
+         p.gold, p.kills, p.flash),
+        game.fighting, game.field_key,
+        None if goals is None else [y*w + x for (x, y) in goals],
+        path is not None,
+        [y*w + x for (x, y) in game.blocked], [y*w + x for (x, y) in game.avoided],
+        (game.coins.version, game.potions.version, game.monsters.version),
+        version, gauss,
+        None if chunks is None else
+        (chunks.seed, chunks.size, bytes(chunks.generated), chunks.version),
+        game.sweep, sparse,
+        game.rooms, game.rng is not random,
+    )
+    sections = (
+        bytes(grid.cells),
+        pack_bits((y*w + x for (x, y) in game.visible), n),
+        pack_bits((y*w + x for (x, y) in game.explored), n),
+        _le(array("I", [y*w + x for (x, y) in game.coins])),
+        _le(array("I", [y*w + x for (x, y) in game.potions])),
+        _le(monsters),
+        _le(field) if field is not None else b"",
+        _le(array("I", [y*w + x for (x, y) in path or ()])),
+        _le(array("I", state)),
+        marshal.dumps(misc),
+    )
+    out = [HEADER.pack(MAGIC, SAVE_VERSION, w, h)]
+    for s in sections:
+        out.append(SECTION.pack(len(s)))
+        out.append(s)
+    return b"".join(out)
+
+
+def loads(data, progress=None):
+    """Rebuild a Game from dumps() output, RNG state included: a game that
+    had its own random.Random gets a new one in the saved state, any other
+    restores the global `random`. `progress` replaces the saved meta-progress dict if given, so the game
+    shares it with the caller."""
+    from src.game import Game, FloorPlan
+
+    magic, version, w, h = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a save file")
+    if not 1 <= version <= SAVE_VERSION:
+        raise ValueError(f"unsupported save version {version}")
+    pos = HEADER.size
+    sections = []
+    for _ in range(10):
+        (length,) = SECTION.unpack_from(data, pos)
+        pos += SECTION.size
+        sections.append(data[pos:pos + length])
+        pos += length
+    cells, visible, explored, coins, potions, monsters, field, path, state, misc = sections
+    misc = marshal.loads(misc)
+    misc += _MISC_ADDED[len(misc) - 21:]  # older versions lack the later fields
+    (floor, ticks, speed_mode, paused, exit_, exit_locked, death_cause, instant,
+     avoid, log, saved_progress, player, fighting, field_key, goals, has_path,
+     blocked, avoided, versions, rng_version, gauss, chunked, sweep, sparse, rooms,
+     own_rng) = misc
+
+    n = w * h
+    pos_of = lambda i: (i % w, i // w)
+    grid = Grid(w, h)
+    grid.cells[:] = cells
+    mons = _arr("i", monsters)
+    plan = FloorPlan(floor, grid, [tuple(r) for r in rooms], tuple(player[:2]), tuple(exit_),
+                     [], [],
+                     [(mons[i] % w, mons[i] // w, mons[i+1], mons[i+3], mons[i+4],
+                       bool(mons[i+5] & _BOSS)) for i in range(0, len(mons), 6)])
+    if chunked is not None:
+        seed, size, generated, chunks_version = chunked
+        plan.chunks = LazyMap(w, h, seed, size, grid=grid, generated=generated)
+        plan.chunks.version = chunks_version
+    if progress is None:
+        progress = saved_progress
+    rng = random.Random() if own_rng else random
+    game = Game(dict(progress, runs=floor - 1), plan=plan, rng=rng)
+    game.progress = progress
+
+    for i, ref in zip(range(0, len(mons), 6), game.monsters.values()):
+        ref.hp, ref.max_hp, ref.flash = mons[i+1], mons[i+2], mons[i+5] & 0xFF
+    game.coins = SpatialIndex(_positions(_arr("I", coins), w))
+    game.potions = SpatialIndex(_positions(_arr("I", potions), w))
+    game.coins.version, game.potions.version, game.monsters.version = versions
+    game.visible = set(_positions(unpack_bits(visible, n), w))
+    game.explored = set(_positions(unpack_bits(explored, n), w))
+    game.explored_order = list(game.explored)
+
+    p = game.player
+    (p.x, p.y, p.hp, p.max_hp, p.atk, p.df, p.regen, p._frac,
+     p.gold, p.kills, p.flash) = player
+    game.ticks, game.speed_mode, game.paused = ticks, speed_mode, paused
+    game.exit_locked, game.death_cause = exit_locked, death_cause
+    game.instant_combat, game.avoid_losing_fights = instant, avoid
+    game.log = log
+    game.fighting = tuple(fighting) if fighting else None
+    game.field = _arr("i", field) if field else None
+    if sparse:
+        pairs = game.field
+        game.field = SparseField(zip(pairs[::2], pairs[1::2]))
+    game.sweep = tuple(sweep) if sweep else None
+    game.field_key = field_key
+    game.field_goals = None if goals is None else [pos_of(i) for i in goals]
+    game.path = [pos_of(i) for i in _arr("I", path)] if has_path else None
+    game.blocked = {pos_of(i) for i in blocked}
+    game.avoided = {pos_of(i) for i in avoided}
+    rng.setstate((rng_version, tuple(_arr("I", state)), gauss))
+    return game
+
+
+def save_game(game, path=SAVE_FILE):
+    """Atomically write `game` to `path`."""
+    atomic_write(path, dumps(game))
+
+
+def load_game(path=SAVE_FILE, progress=None):
+    """Load a saved game, or return None if there is no usable save."""
+    try:
+        with open(path, "rb") as f:
+            return loads(f.read(), progress)
+    except (OSError, ValueError, EOFError, struct.error):
+        return None
+
+
+def delete_save(path=SAVE_FILE):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
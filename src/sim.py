@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# Headless simulation — play floors at full CPU speed with no rendering,
+# input or sleeping. Usage: python -m src.sim --runs 100 --seed 1
+
+import argparse
+import copy
+import json
+import random
+import time
+from src.game import Game
+from src.progress import DEFAULT_PROGRESS, apply_auto_upgrades
+from src.store import RunHistory
+from src.trace import Tracer
+
+MAX_TICKS = 5000  # give up on a floor after this many ticks ("stuck")
+
+
+def new_progress():
+    # deepcopy: DEFAULT_PROGRESS.copy() would share the nested upgrade dicts
+    return copy.deepcopy(DEFAULT_PROGRESS)
+
+
+def simulate_floor(progress, max_ticks=MAX_TICKS, instant_combat=True, recorder=None,
+                   tracer=None):
+    """Play one floor headlessly and return a dict describing the outcome.
+    With `instant_combat` (the default) each fight is resolved in a single
+    tick; with a src.replay.Recorder the floor is recorded, with a
+    src.trace.Tracer its tick phases are timed. Field of view is skipped,
+    as nothing is drawn (chasing monsters still get it)."""
+    game = Game(progress)
+    game.instant_combat = instant_combat
+    game.track_fov = False
+    if tracer:
+        tracer.attach(game)
+    if recorder:
+        recorder.start(game)
+    boss_floor = game.exit_locked
+    while not game.is_over() and game.ticks < max_ticks:
+        game.tick()
+    if recorder:
+        recorder.close(game)
+    res = game.summary()
+    if res["result"] == "running":
+        res["result"] = "stuck"
+    res["boss_floor"] = boss_floor
+    return res
+
+
+def simulate_run(seed, max_floors=None, progress=None, max_ticks=MAX_TICKS,
+                 instant_combat=True, history=None, tracer=None):
+    """Play consecutive floors from `progress` until the runner dies, gets
+    stuck or `max_floors` floors have been escaped. Same seed, same run.
+    Each floor is also logged to `history` (a store.RunHistory) if given."""
+    random.seed(seed)
+    if progress is None:
+        progress = new_progress()
+    floors = []
+    while max_floors is None or len(floors) < max_floors:
+        apply_auto_upgrades(progress)
+        res = simulate_floor(progress, max_ticks=max_ticks, instant_combat=instant_combat,
+                             tracer=tracer)
+        floors.append(res)
+        if history:
+            history.record(res)
+        if res["result"] != "escaped":
+            break
+        progress["bank_gold"] += res["gold"]
+        progress["runs"] += 1
+    last = floors[-1]
+    return {
+        "seed": seed,
+        "depth": last["floor"],
+        "result": last["result"],
+        "cause": last["cause"] or (last["result"] if last["result"] == "stuck" else None),
+        "ticks": sum(f["ticks"] for f in floors),
+        "gold": sum(f["gold"] for f in floors),
+        "kills": sum(f["kills"] for f in floors),
+        "floors": floors,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run Idle Roguelite floors headlessly.")
+    ap.add_argument("--runs", type=int, default=10, help="number of runs to simulate")
+    ap.add_argument("--seed", type=int, default=0, help="seed of the first run")
+    ap.add_argument("--floors", type=int, default=None, help="stop each run after N floors")
+    ap.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="per-floor tick limit")
+    ap.add_argument("--instant-combat", action=argparse.BooleanOptionalAction, default=True,
+                    help="resolve each fight in one tick from its exact outcome distribution "
+                         "(default; --no-instant-combat plays it round by round)")
+    ap.add_argument("--json", action="store_true", help="print one JSON result per line")
+    ap.add_argument("--history", metavar="DB", help="log every floor to this SQLite store")
+    ap.add_argument("--timing", action="store_true", help="print p50/p99 per tick phase")
+    ap.add_argument("--trace", metavar="FILE", help="also write a Chrome trace to FILE")
+    args = ap.parse_args(argv)
+    tracer = Tracer(events=bool(args.trace)) if args.timing or args.trace else None
+
+    start = time.perf_counter()
+    n_floors = 0
+    history = RunHistory(args.history) if args.history else None
+    for seed in range(args.seed, args.seed + args.runs):
+        run = simulate_run(seed, max_floors=args.floors, max_ticks=args.max_ticks,
+                           instant_combat=args.instant_combat, history=history,
+                           tracer=tracer)
+        n_floors += len(run["floors"])
+        if args.json:
+            print(json.dumps(run))
+        else:
+            print(f"seed {seed}: reached floor {run['depth']} ({run['result']}"
+                  f"{', ' + run['cause'] if run['cause'] else ''})  "
+                  f"ticks {run['ticks']}  gold {run['gold']}  kills {run['kills']}")
+    if history:
+        history.close()
+    elapsed = time.perf_counter() - start
+    if not args.json:
+        print(f"\n{args.runs} runs, {n_floors} floors in {elapsed:.2f}s "
+              f"({n_floors / elapsed:.0f} floors/s)")
+    if tracer:
+        print("\n" + tracer.report())
+        if args.trace:
+            tracer.export(args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# SQLite store for meta-progress and an append-only history of every floor
+# played. WAL mode keeps writers from blocking readers, progress is a single
+# row updated in place, and floor results are buffered and inserted in
+# batches, so idle sessions and long simulations can log cheaply.
+#
+#   python -m src.store            # summary of the logged floors
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+DB_FILE = "progress.db"
+
+FLOOR_FIELDS = ("session", "floor", "result", "cause", "gold", "kills", "ticks",
+                "hp", "max_hp", "atk", "df", "regen", "at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS floors (
+    id INTEGER PRIMARY KEY,
+    session TEXT, floor INTEGER, result TEXT, cause TEXT,
+    gold INTEGER, kills INTEGER, ticks INTEGER,
+    hp INTEGER, max_hp INTEGER, atk INTEGER, df INTEGER, regen REAL,
+    at REAL
+);
+CREATE INDEX IF NOT EXISTS floors_session ON floors (session);
+"""
+
+
+def connect(path=DB_FILE):
+    """Open (creating if needed) a store database in WAL mode."""
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; fine for a game
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def read_progress(path=DB_FILE, legacy=None):
+    """Stored progress dict, or None if nothing has been saved yet. A
+    `legacy` JSON progress file is imported (and renamed to .bak) the first
+    time."""
+    conn = connect(path)
+    try:
+        row = conn.execute("SELECT data FROM progress WHERE id = 1").fetchone()
+        if row:
+            return json.loads(row[0])
+        if legacy and os.path.exists(legacy):
+            try:
+                with open(legacy) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return None
+            with conn:
+                conn.execute("INSERT INTO progress (id, data) VALUES (1, ?)",
+                             (json.dumps(data),))
+            os.replace(legacy, f"{legacy}.bak")
+            return data
+        return None
+    finally:
+        conn.close()
+
+
+def write_progress(progress, path=DB_FILE):
+    conn = connect(path)
+    try:
+        with conn:
+            conn.execute("INSERT INTO progress (id, data) VALUES (1, ?) "
+                         "ON CONFLICT (id) DO UPDATE SET data = excluded.data",
+                         (json.dumps(progress, separators=(",", ":")),))
+    finally:
+        conn.close()
+
+
+class RunHistory:
+    """Append-only log of floor results.
+
+    record() only buffers; rows are written with one executemany() per
+    transaction once `batch` rows are pending or `flush_every` seconds have
+    passed, and on flush()/close().
+    """
+
+    def __init__(self, path=DB_FILE, batch=1000, flush_every=5.0, session=None):
+        self.conn = connect(path)
+        self.batch = batch
+        self.flush_every = flush_every
+        self.session = session or uuid.uuid4().hex[:12]
+        self.pending = []
+        self.last_flush = time.monotonic()
+
+    def record(self, floor):
+        """Queue one floor result: a dict with any of FLOOR_FIELDS."""
+        row = dict(floor, session=self.session, at=floor.get("at") or time.time())
+        self.pending.append(tuple(row.get(k) for k in FLOOR_FIELDS))
+        if len(self.pending) >= self.batch or \
+                time.monotonic() - self.last_flush >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            with self.conn:
+                self.conn.executemany(
+                    f"INSERT INTO floors ({', '.join(FLOOR_FIELDS)}) "
+                    f"VALUES ({', '.join('?' * len(FLOOR_FIELDS))})", self.pending)
+            self.pending.clear()
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def summary(self, session=None):
+        """Counts by result plus depth, gold and tick totals."""
+        where, args = ("WHERE session = ?", (session,)) if session else ("", ())
+        self.flush()
+        results = dict(self.conn.execute(
+            f"SELECT result, COUNT(*) FROM floors {where} GROUP BY result", args))
+        floors, deepest, gold, kills, ticks = self.conn.execute(
+            f"SELECT COUNT(*), MAX(floor), SUM(gold), SUM(kills), SUM(ticks) FROM floors {where}",
+            args).fetchone()
+        return {"floors": floors, "results": results, "deepest": deepest,
+                "gold": gold or 0, "kills": kills or 0, "ticks": ticks or 0}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Summarize the logged floor history.")
+    ap.add_argument("--db", default=DB_FILE, help="store database")
+    ap.add_argument("--session", help="only this session")
+    args = ap.parse_args(argv)
+    with RunHistory(args.db) as history:
+        s = history.summary(args.session)
+    print(f"{s['floors']} floors logged, deepest {s['deepest']}")
+    print("  " + "  ".join(f"{k} {v}" for k, v in sorted(s["results"].items(), key=str)))
+    print(f"  gold {s['gold']}  kills {s['kills']}  ticks {s['ticks']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# Opt-in timing of Game.tick phases and frame drawing.
+#
+# A Tracer wraps the phase methods of one Game instance (and any function
+# handed to wrap()), so nothing is measured, and nothing costs anything,
+# unless a tracer is attached. Each wrapped call feeds a log-linear
+# histogram (p50/p99 without keeping samples) and, if enabled, a bounded
+# buffer of Chrome trace events for chrome://tracing or ui.perfetto.dev.
+
+import json
+import os
+import time
+from collections import deque
+
+# Phase name -> Game method timed under it
+PHASES = {
+    "regen": "_regen",
+    "combat": "_handle_combat",
+    "chase": "_move_monsters",
+    "pickups": "_handle_pickups",
+    "targets": "_choose_targets",
+    "path": "_move_along_path",
+    "repair": "_repair_path",
+    "fov": "compute_visibility",
+}
+MAX_EVENTS = 1_000_000  # oldest trace events are dropped past this
+_SUB = 3  # histogram: 2**_SUB buckets per power of two (~6% error)
+
+
+class Histogram:
+    """Log-linear histogram of nanosecond durations."""
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, ns):
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+        shift = ns.bit_length() - _SUB - 1
+        key = ns if shift <= 0 else ((shift + 1) << _SUB) | ((ns >> shift) & ((1 << _SUB) - 1))
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    @staticmethod
+    def _value(key):
+        """Midpoint of a bucket."""
+        if key < 2 << _SUB:
+            return key
+        shift = (key >> _SUB) - 1
+        low = ((1 << _SUB) | (key & ((1 << _SUB) - 1))) << shift
+        return low + (1 << shift) // 2
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0
+        rank = pct / 100 * self.count
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen >= rank:
+                return min(self._value(key), self.max)
+        return self.max
+
+
+class Tracer:
+    def __init__(self, events=False, overlay=False, max_events=MAX_EVENTS):
+        self.hists = {}
+        self.events = deque(maxlen=max_events) if events else None
+        self.overlay = overlay
+        self.t0 = time.perf_counter_ns()
+
+    def wrap(self, name, fn):
+        """Return `fn` timed under `name`."""
+        hist = self.hists.setdefault(name, Histogram())
+        events = self.events
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kw):
+            start = clock()
+            try:
+                return fn(*args, **kw)
+            finally:
+                end = clock()
+                hist.add(end - start)
+                if events is not None:
+                    events.append((name, start, end))
+        return timed
+
+    def attach(self, game):
+        """Time `game`'s tick and phases; the class stays untouched."""
+        for name, method in PHASES.items():
+            setattr(game, method, self.wrap(name, getattr(game, method)))
+        game.tick = self.wrap("tick", game.tick)
+        game.tracer = self
+        return game
+
+    def stats(self):
+        """{name: {count, mean_us, p50_us, p99_us, max_us}}"""
+        return {name: {"count": h.count,
+                       "mean_us": h.total / h.count / 1000,
+                       "p50_us": h.percentile(50) / 1000,
+                       "p99_us": h.percentile(99) / 1000,
+                       "max_us": h.max / 1000}
+                for name, h in self.hists.items() if h.count}
+
+    def overlay_line(self):
+        """One HUD line: p50/p99 in ms for the tick, path, FOV and draw."""
+        parts = []
+        for name in ("tick", "path", "fov", "draw"):
+            h = self.hists.get(name)
+            if h and h.count:
+                parts.append(f"{name} {h.percentile(50) / 1e6:.2f}/{h.percentile(99) / 1e6:.2f}")
+        return "Timing p50/p99 ms: " + "  ".join(parts) if parts else "Timing: -"
+
+    def report(self):
+        lines = [f"{'phase':10} {'count':>9} {'mean µs':>10} {'p50 µs':>10} {'p99 µs':>10} {'max µs':>10}"]
+        for name, s in sorted(self.stats().items(), key=lambda kv: -kv[1]["mean_us"] * kv[1]["count"]):
+            lines.append(f"{name:10} {s['count']:9} {s['mean_us']:10.1f} {s['p50_us']:10.1f} "
+                         f"{s['p99_us']:10.1f} {s['max_us']:10.1f}")
+        return "\n".join(lines)
+
+    def export(self, path):
+        """Write the buffered events as Chrome trace-event JSON."""
+        pid = os.getpid()
+        t0 = self.t0
+        events = [{"name": name, "ph": "X", "pid": pid, "tid": 0,
+                   "ts": (start - t0) / 1000, "dur": (end - start) / 1000}
+                  for name, start, end in self.events or ()]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,30 @@
+# tests/test_balance.py
+import pytest
+from src import game, progress
+from src.balance import apply_overrides, check_grid, config_grid, run_batch
+
+def test_apply_overrides_and_reset():
+    apply_overrides({"FLOOR_SCALING": 2.0, "UPGRADE_COSTS.hp": 5})
+    assert game.FLOOR_SCALING == 2.0
+    assert progress.UPGRADE_COSTS["hp"] == 5
+    apply_overrides({})
+    assert game.FLOOR_SCALING == 1.0
+    assert progress.UPGRADE_COSTS["hp"] == 20
+def test_overrides_of_one_dict_all_apply():
+    apply_overrides({"UPGRADE_COSTS.hp": 15, "UPGRADE_COSTS.atk": 20})
+    assert progress.UPGRADE_COSTS["hp"] == 15 and progress.UPGRADE_COSTS["atk"] == 20
+    apply_overrides({})
+    assert progress.UPGRADE_COSTS["hp"] == 20
+def test_config_grid():
+    grid = config_grid({"A": [1, 2], "B": [3]})
+    assert grid == [{"A": 1, "B": 3}, {"A": 2, "B": 3}]
+def test_run_batch_summary():
+    (overrides, summary), = run_batch(3, seed=5, max_floors=2, workers=2)
+    assert overrides == {}
+    assert summary["runs"] == 3
+    assert 1 <= summary["depth"]["p50"] <= 2
+def test_sweeps_of_tunables_the_policy_ignores_are_rejected():
+    with pytest.raises(ValueError, match="AUTO_SPEND_RATIO"):
+        check_grid(config_grid({"AUTO_SPEND_RATIO.hp": [0.3, 0.6]}))
+    check_grid(config_grid({"AUTO_SPEND_RATIO.hp": [0.3, 0.6],
+                            "AUTO_UPGRADE_POLICY": ["plan", "ratio"]}))
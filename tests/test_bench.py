@@ -0,0 +1,16 @@
+# tests/test_bench.py
+from bench.run import run_suite, compare
+from src import config, game
+
+def test_bench_suite_smoke():
+    report = run_suite(["small"], repeat=1, number=1)
+    assert "small/tick" in report["results"]
+    assert report["results"]["small/astar"]["best_us"] > 0
+    assert game.MAP_W == config.MAP_W == 60  # overrides were reset
+
+def test_compare_flags_regressions():
+    report = {"results": {"a": {"best_us": 130.0}, "b": {"best_us": 90.0}, "c": {"best_us": 1.0}}}
+    base = {"results": {"a": {"best_us": 100.0}, "b": {"best_us": 100.0}}}
+    rows = {r[0]: r for r in compare(report, base, threshold=1.25)}
+    assert rows["a"][4] and not rows["b"][4]
+    assert rows["c"][2] is None
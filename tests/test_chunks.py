@@ -0,0 +1,64 @@
+# tests/test_chunks.py
+import copy
+import random
+import pytest
+from src.balance import apply_overrides
+from src.dungeon.chunks import LazyMap
+from src.dungeon.pathfinding import astar
+from src.game import Game
+from src.progress import DEFAULT_PROGRESS
+from src.render import FrameRenderer, viewport
+from src.replay import fingerprint
+from src.savestate import dumps, loads
+
+@pytest.fixture
+def huge_map():
+    apply_overrides({"MAP_W": 400, "MAP_H": 400})
+    yield
+    apply_overrides({})
+
+def test_chunks_do_not_depend_on_generation_order():
+    a = LazyMap(200, 120, seed=7)
+    b = LazyMap(200, 120, seed=7)
+    for cx, cy in [(0, 0), (1, 0), (2, 1), (4, 2)]:
+        a.generate(cx, cy)
+    for cx, cy in [(4, 2), (2, 1), (1, 0), (0, 0)]:
+        b.generate(cx, cy)
+    assert a.grid.cells == b.grid.cells
+    assert a.generate(0, 0) is None
+
+def test_neighbouring_chunks_connect_through_doors():
+    m = LazyMap(120, 80, seed=3)
+    m.ensure(60, 40, radius=2)
+    start = m.door((0, 0), (1, 0))
+    for other in [(2, 1), (0, 1), (1, 1)]:
+        goal = m.door(other, (other[0], other[1] - 1))
+        assert astar(m.grid, start, [goal]) is not None
+
+def test_chunked_floor_plays_and_renders_a_viewport(huge_map):
+    random.seed(5)
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS))
+    assert g.chunks is not None
+    assert sum(g.chunks.generated) < g.chunks.cw * g.chunks.ch
+    for _ in range(100):
+        g.tick()
+    x0, y0, w, h = viewport(g, (80, 30))
+    assert (w, h) == (80, 30)
+    assert x0 <= g.player.x < x0 + w and y0 <= g.player.y < y0 + h
+    frame = FrameRenderer().frame(g)
+    assert len(frame) < 80 * 30 * 20
+
+def test_chunked_game_save_roundtrip(huge_map):
+    random.seed(2)
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS))
+    for _ in range(150):
+        g.tick()
+    state = random.getstate()
+    g2 = loads(dumps(g))
+    assert fingerprint(g2) == fingerprint(g)
+    assert g2.chunks.generated == g.chunks.generated
+    for game in (g, g2):
+        random.setstate(state)  # both play on from the saved global RNG
+        for _ in range(150):
+            game.tick()
+    assert fingerprint(g2) == fingerprint(g)
@@ -0,0 +1,67 @@
+# tests/test_combat.py
+import copy
+import random
+from src.balance import apply_overrides
+from src.combat import outcome, fight_odds, resolve_fight, kill_round_cdf
+from src.dungeon.constants import FLOOR
+from src.dungeon.entities import Player, Monster
+from src.dungeon.grid import as_grid
+from src.game import FloorPlan, Game
+from src.progress import DEFAULT_PROGRESS
+
+def test_kill_round_cdf():
+    assert kill_round_cdf(10, 10, 15) == (1.0,)
+    assert kill_round_cdf(20, 10, 15) == (0.0, 1.0)
+    assert abs(kill_round_cdf(25, 10, 15)[1] - (1 - 0.9 ** 2)) < 1e-12
+
+def test_outcome_certain_win_and_loss():
+    win = outcome(30, 30, 0.0, 0.0, 10, 0, 10, 5, 0)
+    assert win.win == 1.0 and win.rounds == 1.0 and win.hp_lost == 0.0
+    loss = outcome(5, 5, 0.0, 0.0, 1, 0, 100, 5, 0)
+    assert loss.win == 0.0 and loss.hp_lost == 5 and loss.rounds == 1
+
+def test_resolve_fight_matches_odds():
+    rng = random.Random(3)
+    wins = 0
+    for _ in range(2000):
+        p = Player(0, 0, 20, 6, 0, 0.0)
+        m = Monster(1, 0, 25, 6, 0)
+        resolve_fight(p, m, rng)
+        assert (p.hp > 0) != (m.hp > 0)
+        wins += m.hp <= 0
+    odds = fight_odds(Player(0, 0, 20, 6, 0, 0.0), Monster(1, 0, 25, 6, 0))
+    assert abs(odds.win - (1 - 0.9 ** 4)) < 1e-12
+    assert abs(wins / 2000 - odds.win) < 0.05
+
+def _play_fight(instant, seed):
+    grid = as_grid([[FLOOR] * 6])
+    plan = FloorPlan(1, grid, [(0, 0, 6, 1)], (0, 0), (5, 0), [], [], [(1, 0, 24, 6, 0, False)])
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS), plan=plan, rng=random.Random(seed))
+    g.instant_combat, g.avoid_losing_fights = instant, False
+    g.tick()  # walks up to the monster
+    p = g.player
+    p.hp, p.max_hp, p.regen, p._frac, p.atk, p.df = 17, 30, 0.5, 0.0, 6, 0
+    rounds = 0
+    while (1, 0) in g.monsters and p.is_alive():
+        g.tick()
+        rounds += 1
+    if instant:
+        rounds = next(int(e.split()[3]) for e in g.log if e.startswith("Fight resolved"))
+    return p.is_alive(), rounds
+
+def test_instant_combat_matches_rounds_with_regen():
+    for_modes = [[_play_fight(instant, seed) for seed in range(600)] for instant in (False, True)]
+    (win_a, rounds_a), (win_b, rounds_b) = [
+        (sum(w for w, _ in fights) / len(fights), sum(r for _, r in fights) / len(fights))
+        for fights in for_modes]
+    assert 0 < win_a < 0.1
+    assert abs(win_a - win_b) < 0.03
+    assert abs(rounds_a - rounds_b) < 0.1
+
+def test_crit_tunables_reach_both_combat_paths():
+    apply_overrides({"CRIT_CHANCE": 1.0})
+    try:
+        assert kill_round_cdf(25, 10, 15) == (0.0, 1.0, 1.0)
+        assert _play_fight(False, 0) == _play_fight(True, 0) == (True, 3)
+    finally:
+        apply_overrides({})
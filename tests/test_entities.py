@@ -1,5 +1,5 @@
 # tests/test_entities.py
-from src.dungeon.entities import Player, Monster
+from src.dungeon.entities import Player, Monster, MonsterTable
 
 def test_player_initialization():
     p = Player(1, 2, 30, 5, 1, 0.1)
@@ -8,4 +8,25 @@ def test_player_initialization():
     assert p.df == 1
     assert p.regen == 0.1
     assert p.x == 1
-    assert p.y == 2
\ No newline at end of file
+    assert p.y == 2
+def test_entities_are_slotted():
+    p = Player(0, 0, 30, 5, 1, 0.5)
+    assert not hasattr(p, "__dict__")
+    p.hp = 10
+    p.tick_regen()
+    p.tick_regen()
+    assert p.hp == 11
+    assert Monster(0, 0, 5, 1, 1).is_boss is False
+def test_monster_table_rows():
+    table = MonsterTable()
+    a = table.spawn(1, 2, 10, 3, 1)
+    b = table.spawn(4, 5, 40, 5, 2, is_boss=True)
+    assert (a.x, a.y, a.hp, a.max_hp, a.is_boss) == (1, 2, 10, 10, False)
+    assert b.is_boss and len(table) == 2
+    a.hp -= 4
+    a.flash = 2
+    table.decay_flash()
+    assert a.hp == 6 and a.flash == 1 and b.flash == 0
+    table.release(a)
+    c = table.spawn(7, 7, 12, 4, 1)
+    assert c.i == a.i and len(table) == 2 and c.hp == 12
@@ -0,0 +1,29 @@
+# tests/test_fov.py
+import random
+from src.dungeon.fov import compute_fov
+from src.dungeon.constants import FLOOR, WALL
+from src.dungeon.mapgen import make_empty_map, place_rooms, connect_rooms, all_floor_positions
+
+def test_fov_open_room_within_radius():
+    grid = [[FLOOR]*21 for _ in range(21)]
+    seen = compute_fov(grid, (10, 10), 5)
+    assert (10, 10) in seen
+    assert (15, 10) in seen and (10, 5) in seen
+    assert (16, 10) not in seen
+    assert (14, 14) not in seen  # outside the circle
+def test_fov_wall_blocks_sight():
+    grid = [[FLOOR]*9 for _ in range(9)]
+    for y in range(9):
+        grid[y][5] = WALL
+    seen = compute_fov(grid, (2, 4), 8)
+    assert (5, 4) in seen      # the wall itself is visible
+    assert (6, 4) not in seen  # tiles behind it are not
+def test_fov_is_symmetric():
+    random.seed(3)
+    grid = make_empty_map(40, 20)
+    connect_rooms(grid, place_rooms(grid))
+    floors = all_floor_positions(grid)
+    for a in random.sample(floors, 10):
+        for b in compute_fov(grid, a, 8):
+            if grid[b[1]][b[0]] == FLOOR:
+                assert a in compute_fov(grid, b, 8)
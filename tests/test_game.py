@@ -1,6 +1,21 @@
 # tests/test_game.py
-from src.game import Game
+import copy
+import random
+import pytest
+from src.balance import apply_overrides
+from src.game import FloorPlan, Game, plan_floor
 from src.progress import DEFAULT_PROGRESS
+from src.dungeon.constants import FLOOR
+from src.dungeon.grid import as_grid
+from src.dungeon.spatial import SpatialIndex
+from src.replay import fingerprint
+from src.savestate import dumps, loads
+
+@pytest.fixture
+def chasing():
+    apply_overrides({"CHASE_RADIUS": 8})
+    yield
+    apply_overrides({})
 
 def test_game_initializes():
     g = Game(DEFAULT_PROGRESS.copy())
@@ -11,3 +26,96 @@ def test_game_tick_runs():
     g = Game(DEFAULT_PROGRESS.copy())
     g.tick()
     assert g.player.hp > 0
+
+def test_cached_path_reused_and_repaired():
+    random.seed(2)
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS))
+    g.coins, g.potions, g.monsters = SpatialIndex(), SpatialIndex(), SpatialIndex()
+    g.tick()
+    path = g.path
+    assert path[0] == (g.player.x, g.player.y)
+    g.tick()
+    assert g.path is path  # still following the cached path
+    goal, tile = path[-1], path[2]
+    g.set_blocked(tile)
+    assert tile not in g.path
+    assert g.path[0] == (g.player.x, g.player.y)
+    assert g.path[-1] == goal == g.exit
+
+def test_game_uses_pregenerated_plan():
+    progress = copy.deepcopy(DEFAULT_PROGRESS)
+    plan = plan_floor(1, random.Random(4))
+    g = Game(progress, plan=plan)
+    assert g.grid is plan.grid
+    assert (g.player.x, g.player.y) == plan.spawn
+    assert g.exit == plan.exit
+    assert len(g.monsters) == len(plan.monsters)
+    again = plan_floor(1, random.Random(4))
+    assert again.grid.cells == plan.grid.cells and again.coins == plan.coins
+def test_monsters_chase_and_attack(chasing):
+    grid = as_grid([[FLOOR] * 12 for _ in range(7)])
+    plan = FloorPlan(1, grid, [(0, 0, 12, 7)], (1, 3), (11, 6), [], [],
+                     [(9, 0, 10, 3, 0, False), (5, 6, 40, 5, 2, True)])
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS), plan=plan)
+    for _ in range(10):
+        g.tick()
+        if g.fighting:
+            break
+    mx, my = g.fighting
+    assert abs(mx - g.player.x) + abs(my - g.player.y) == 1
+    assert not g.monsters[(mx, my)].is_boss
+    assert (5, 6) in g.monsters  # bosses stay put
+def _room_game(*monsters):
+    grid = as_grid([[FLOOR] * 12 for _ in range(7)])
+    plan = FloorPlan(1, grid, [(0, 0, 12, 7)], (1, 3), (11, 3), [], [], list(monsters))
+    return Game(copy.deepcopy(DEFAULT_PROGRESS), plan=plan)
+
+def _reach(pos, steps=2):
+    return {(x, y) for x in range(12) for y in range(7)
+            if abs(x - pos[0]) + abs(y - pos[1]) <= steps}
+
+def test_only_stepping_monsters_attack(chasing):
+    # the runner walks up to the first monster, the second steps up to it
+    for mx, event in ((3, "Encounter!"), (4, "A monster attacks!")):
+        g = _room_game((mx, 3, 10, 3, 0, False))
+        g.tick()
+        g.tick()
+        assert g.fighting == (3, 3) and g.log[-1] == event
+
+def test_runner_keeps_clear_of_dangerous_chasers(chasing):
+    g = _room_game((8, 3, 500, 50, 0, False))
+    g.tick()
+    g.tick()  # the chaser's first step
+    assert list(g.monsters) == [(7, 3)]
+    zone = _reach((7, 3))
+    assert zone <= g.avoided <= g.blocked and zone.isdisjoint(g.path)
+    g.tick()
+    runner = (g.player.x, g.player.y)  # never blocked under the runner itself
+    g.tick()  # the blocks move with it
+    (pos,) = g.monsters
+    assert pos != (7, 3) and g.fighting is None
+    assert _reach(pos) - {runner} <= g.blocked
+    assert not (zone - _reach(pos)) & g.blocked
+
+def test_cut_off_runner_faces_chasers(chasing):
+    # the runner walks up to the monster, which then never steps: in a
+    # corridor with no way around, waiting would never end
+    plan = FloorPlan(1, as_grid([[FLOOR] * 12]), [(0, 0, 12, 1)], (1, 0), (11, 0), [], [],
+                     [(3, 0, 500, 50, 0, False)])
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS), plan=plan)
+    for _ in range(12):
+        g.tick()
+    assert g.result() == "dead"
+
+def test_chasing_game_save_roundtrip(chasing):
+    random.seed(6)
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS), rng=random.Random(6))
+    for _ in range(60):
+        g.tick()
+    g2 = loads(dumps(g))  # with its own copy of g's RNG
+    for game in (g, g2):
+        for _ in range(200):
+            if game.is_over():
+                break
+            game.tick()
+    assert fingerprint(g2) == fingerprint(g)
@@ -0,0 +1,53 @@
+# tests/test_main.py
+import copy
+import pytest
+from src import main
+from src.progress import DEFAULT_PROGRESS
+
+@pytest.mark.parametrize("interval", [0.0, 0.0005])
+def test_run_floor_finishes(monkeypatch, tmp_path, interval):
+    monkeypatch.setattr(main, "TICK_SPEEDS", {"normal": interval})
+    monkeypatch.chdir(tmp_path)
+    progress = copy.deepcopy(DEFAULT_PROGRESS)
+    keep_going = main.run_floor(progress)
+    assert progress["runs"] == (1 if keep_going else 0)
+
+def test_paused_max_speed_does_not_spin(monkeypatch, tmp_path):
+    import time
+    from src.game import Game
+
+    class Keys:
+        def __init__(self):
+            self.start = None
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def fileno(self):
+            return None
+        def read_keys(self):
+            if self.start is None:
+                self.start = time.monotonic()
+                return ["p"]
+            return ["q"] if time.monotonic() - self.start > 0.2 else []
+
+    calls = []
+    tick = Game.tick
+    monkeypatch.setattr(Game, "tick", lambda self: (calls.append(1), tick(self)))
+    monkeypatch.setattr(main, "KeyReader", Keys)
+    monkeypatch.setattr(main, "TICK_SPEEDS", {"normal": 0.0})
+    monkeypatch.chdir(tmp_path)
+    assert main.run_floor(copy.deepcopy(DEFAULT_PROGRESS)) is False
+    assert len(calls) < 10
+
+def test_death_keeps_banked_progress(monkeypatch, tmp_path):
+    from src.game import Game
+    monkeypatch.chdir(tmp_path)
+    progress = copy.deepcopy(DEFAULT_PROGRESS)
+    progress.update(runs=3, bank_gold=50)
+    progress["upgrades"]["hp"] = 2
+    saved = copy.deepcopy(progress)
+    game = Game(progress)
+    game.player.hp = 0
+    assert main._end_floor(game, progress) is False
+    assert progress == saved
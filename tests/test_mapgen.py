@@ -1,5 +1,8 @@
 # tests/test_mapgen.py
-from src.dungeon.mapgen import make_empty_map, place_rooms, all_floor_positions
+import random
+from src.dungeon.mapgen import (make_empty_map, place_rooms, all_floor_positions,
+                                generate_floor, generate_floors, connect_rooms,
+                                room_center, carve_corridor)
 
 def test_room_generation():
     grid = make_empty_map(40, 20)
@@ -8,4 +11,33 @@ def test_room_generation():
     assert len(rooms) > 0
     assert len(floors) > 0
     for (x, y) in floors:
-        assert grid[y][x] == '.'  # FLOOR tile
\ No newline at end of file
+        assert grid[y][x] == '.'  # FLOOR tile
+def test_grid_flat_and_row_access_agree():
+    grid = make_empty_map(10, 6)
+    grid[2][3] = '.'
+    assert grid.cells[2*10 + 3] == ord('.')
+    assert grid.get(3, 2) == '.'
+    assert len(grid) == 6 and len(grid[0]) == 10
+    assert grid.row(2) == "###.######"
+
+def test_generate_floors_batch_is_reproducible():
+    batch = generate_floors(3, seed=11, w=40, h=20)
+    assert len(batch) == 3
+    grid, rooms = generate_floor(40, 20, random.Random("11/1"))
+    assert rooms == batch[1][1]
+    assert grid.cells == batch[1][0].cells
+    for i, (x, y, rw, rh) in enumerate(rooms):
+        for (x2, y2, rw2, rh2) in rooms[i+1:]:
+            assert x > x2 + rw2 or x2 > x + rw or y > y2 + rh2 or y2 > y + rh
+def test_connect_rooms_links_nearest_earliest_room():
+    rng = random.Random(5)
+    rooms = [(rng.randrange(150), rng.randrange(60), 4, 3) for _ in range(120)]
+    grid = make_empty_map(160, 70)
+    connect_rooms(grid, rooms)
+    # Brute force: each room joins the earliest of the nearest previous ones
+    want = make_empty_map(160, 70)
+    centers = [room_center(r) for r in rooms]
+    for k, (cx, cy) in enumerate(centers[1:], 1):
+        nx, ny = min(centers[:k], key=lambda c: abs(c[0]-cx) + abs(c[1]-cy))
+        carve_corridor(want, cx, cy, nx, ny)
+    assert grid.cells == want.cells
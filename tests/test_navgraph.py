@@ -0,0 +1,58 @@
+# tests/test_navgraph.py
+import copy
+import random
+from src.balance import apply_overrides
+from src.dungeon.grid import WALL_CODE
+from src.dungeon.mapgen import generate_floor, room_center, all_floor_positions
+from src.dungeon.navgraph import NavGraph
+from src.dungeon.pathfinding import astar
+from src.game import Game
+from src.progress import DEFAULT_PROGRESS
+from src.replay import fingerprint
+from src.savestate import dumps, loads
+
+def _floor(seed, w=120, h=50):
+    return generate_floor(w, h, random.Random(seed))
+
+def test_paths_are_as_short_as_astar():
+    for seed in range(3):
+        grid, rooms = _floor(seed)
+        nav = NavGraph(grid, rooms)
+        rng = random.Random(seed)
+        tiles = all_floor_positions(grid)
+        for _ in range(25):
+            start = rng.choice(tiles)
+            goals = rng.sample(tiles, rng.choice((1, 3)))
+            path = nav.path(start, goals)
+            assert len(path) == len(astar(grid, start, goals))
+            assert path[0] == start and path[-1] in goals
+            for (ax, ay), (bx, by) in zip(path, path[1:]):
+                assert abs(ax - bx) + abs(ay - by) == 1
+                assert grid.cells[by*grid.w + bx] != WALL_CODE
+
+def test_unreachable_goal():
+    grid, rooms = _floor(1)
+    walls = [i for i, c in enumerate(grid.cells) if c == WALL_CODE]
+    start = room_center(rooms[0])
+    assert NavGraph(grid, rooms).path(start, [(walls[0] % grid.w, walls[0] // grid.w)]) is None
+
+def test_big_floor_uses_the_room_graph_and_survives_a_save():
+    apply_overrides({"MAP_W": 120, "MAP_H": 50})
+    try:
+        random.seed(4)
+        g = Game(copy.deepcopy(DEFAULT_PROGRESS), rng=random.Random(4))
+        assert g.plan.nav is None  # built on the first long-path query
+        for items in (g.coins, g.potions):
+            for pos in list(items):
+                items.remove(pos)  # head straight for the exit
+        for _ in range(60):
+            g.tick()
+        assert g.field is None and g.path and g.plan.nav is not None
+        data = dumps(g)
+        g2 = loads(data)  # with its own copy of g's RNG
+        for game in (g, g2):
+            for _ in range(60):
+                game.tick()
+        assert fingerprint(g2) == fingerprint(g)
+    finally:
+        apply_overrides({})
@@ -0,0 +1,63 @@
+# tests/test_party.py
+import copy
+import random
+import pytest
+from src.game import plan_floor
+from src.party import Party, play
+from src.progress import DEFAULT_PROGRESS
+from src.render import TiledRenderer
+from src.replay import fingerprint
+from src.savestate import dumps, loads
+
+def _progresses(n, floor=1):
+    out = []
+    for i in range(n):
+        p = copy.deepcopy(DEFAULT_PROGRESS)
+        p["runs"] = floor - 1
+        p["upgrades"].update(hp=10 + 5*i, atk=8, regen=i)
+        out.append(p)
+    return out
+
+def test_runners_share_an_unchanged_floor():
+    random.seed(3)
+    party = Party(_progresses(3, floor=5))
+    cells = bytes(party.plan.grid.cells)
+    play(party, 3000)
+    assert all(g.grid is party.plan.grid for g in party.games)
+    assert bytes(party.plan.grid.cells) == cells  # boss kills don't unlock it for everyone
+    assert any(g.result() == "escaped" for g in party.games)
+    assert len({g.player.kills for g in party.games} | {g.ticks for g in party.games}) > 1
+
+def test_runners_do_not_share_random_rolls():
+    random.seed(2)
+    plan = plan_floor(1)
+    solo, = play(Party(_progresses(1), plan=plan, seed=9), 3000)
+    first = play(Party(_progresses(3), plan=plan, seed=9), 3000)[0]
+    assert first == solo
+def test_party_needs_one_floor():
+    with pytest.raises(ValueError):
+        Party(_progresses(1, floor=1) + _progresses(1, floor=2))
+
+def test_tiled_view_redraws_only_changes():
+    random.seed(1)
+    party = Party(_progresses(4), plan=plan_floor(1))
+    r = TiledRenderer()
+    party.tick()
+    first = r.frame(party.games, party.names, (100, 40))
+    assert "\033[2J" in first and "runner 4" in first
+    party.tick()
+    assert len(r.frame(party.games, party.names, (100, 40))) < len(first) // 2
+
+def test_saved_runner_keeps_its_own_rng():
+    random.seed(5)
+    game = Party(_progresses(2), seed=4).games[0]
+    for _ in range(40):
+        game.tick()
+    g2 = loads(dumps(game))
+    assert g2.rng is not random and g2.rng.getstate() == game.rng.getstate()
+    for g in (game, g2):
+        random.seed(0)  # the global RNG mustn't matter
+        for _ in range(300):
+            if not g.is_over():
+                g.tick()
+    assert fingerprint(g2) == fingerprint(game)
@@ -1,5 +1,5 @@
 # tests/test_pathfinding.py
-from src.dungeon.pathfinding import astar
+from src.dungeon.pathfinding import astar, distance_field, path_from_field
 from src.dungeon.constants import FLOOR
 
 def test_astar_simple():
@@ -18,4 +18,40 @@ def test_astar_multiple_goals():
     grid = [[FLOOR]*5 for _ in range(5)]
     path = astar(grid, (0,0), [(4,4), (2,2)])
     assert path[-1] == (2,2)
-    assert len(path) > 1
\ No newline at end of file
+    assert len(path) > 1
+def test_distance_field_multiple_goals():
+    grid = [[FLOOR]*5 for _ in range(5)]
+    field = distance_field(grid, [(4,4), (0,4)])
+    assert field[4*5 + 4] == 0 and field[4*5 + 0] == 0
+    assert field[0] == 4
+    path = path_from_field(grid, field, (0,0))
+    assert path[0] == (0,0) and path[-1] == (0,4)
+    assert len(path) == 5
+def test_distance_field_unreachable():
+    grid = [[FLOOR]*5 for _ in range(5)]
+    for i in range(5):
+        grid[2][i] = '#'
+    field = distance_field(grid, [(4,4)])
+    assert path_from_field(grid, field, (0,0)) is None
+def test_jps_matches_astar_lengths():
+    import random
+    from src.dungeon.pathfinding import jps
+    from src.dungeon.mapgen import generate_floor, all_floor_positions
+    rng = random.Random(4)
+    grid, _ = generate_floor(60, 24, rng)
+    tiles = all_floor_positions(grid)
+    for _ in range(50):
+        start, goals = rng.choice(tiles), rng.sample(tiles, rng.choice((1, 3)))
+        blocked = set(rng.sample(tiles, 6)) - {start}
+        a, b = astar(grid, start, goals, blocked), jps(grid, start, goals, blocked)
+        assert (a is None) == (b is None)
+        if a:
+            assert len(a) == len(b) and b[0] == start and b[-1] in goals
+            assert all(abs(x1-x2) + abs(y1-y2) == 1 and p not in blocked
+                       for (x1, y1), (x2, y2), p in zip(b, b[1:], b[1:]))
+def test_jps_open_room():
+    from src.dungeon.pathfinding import jps
+    grid = [[FLOOR]*9 for _ in range(9)]
+    grid[4][1:8] = ['#']*7
+    path = jps(grid, (4,0), [(4,8)])
+    assert len(path) == len(astar(grid, (4,0), [(4,8)])) == 17
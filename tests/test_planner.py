@@ -0,0 +1,56 @@
+# tests/test_planner.py
+import copy
+import time
+from src.planner import STATS, plan_upgrades, score, win_chance
+from src.progress import (DEFAULT_PROGRESS, UPGRADE_COSTS,
+                          apply_auto_upgrades, derived_stats)
+from src.combat import outcome
+
+NONE = {"hp": 0, "atk": 0, "def": 0, "regen": 0}
+
+def _stats(upgrades):
+    p = copy.deepcopy(DEFAULT_PROGRESS)
+    p["upgrades"] = upgrades
+    return derived_stats(p)
+
+def test_plan_stays_within_the_bank():
+    for bank in (0, 15, 20, 95, 1234):
+        plan = plan_upgrades(bank, NONE, 3)
+        spent = sum(n * UPGRADE_COSTS[s] for s, n in plan.items())
+        assert spent <= bank and bank - spent < min(UPGRADE_COSTS.values())
+
+def test_plan_beats_every_single_stat_build():
+    bank, floor = 600, 6
+    plan = plan_upgrades(bank, NONE, floor)
+    best = score(_stats(plan), floor)
+    for stat in STATS:
+        only = dict(NONE, **{stat: bank // UPGRADE_COSTS[stat]})
+        assert best >= score(_stats(only), floor)
+
+def test_shortcut_matches_exact_odds():
+    for hp, atk, df, regen, m in [(40, 8, 3, 0.0, (15, 5, 1)), (34, 6, 1, 5.0, (20, 6, 1))]:
+        assert win_chance(hp, atk, df, regen, m) == outcome(hp, hp, regen, 0.0, atk, df, *m).win
+
+def test_large_banks_plan_fast():
+    start = time.perf_counter()
+    plan_upgrades(10**7, NONE, 40)
+    assert time.perf_counter() - start < 1.0
+
+def test_apply_auto_upgrades_policies():
+    for policy in ("plan", "ratio"):
+        p = copy.deepcopy(DEFAULT_PROGRESS)
+        p["bank_gold"] = 500
+        apply_auto_upgrades(p, policy)
+        spent = sum(n * UPGRADE_COSTS[s] for s, n in p["upgrades"].items())
+        assert spent + p["bank_gold"] == 500 and spent > 0
+
+def test_plans_follow_floor_scaling():
+    from src.balance import apply_overrides
+    try:
+        apply_overrides({"FLOOR_SCALING": 0.5})
+        easy = plan_upgrades(300, NONE, 10), score(_stats(NONE), 2)
+        apply_overrides({"FLOOR_SCALING": 3.0})
+        hard = plan_upgrades(300, NONE, 10), score(_stats(NONE), 2)
+    finally:
+        apply_overrides({})
+    assert easy[0] != hard[0] and easy[1] > hard[1]
@@ -1,9 +1,36 @@
 # tests/test_render.py
-from src.render import draw
+import io
+from src.render import draw, reset_frame
 from src.game import Game
 from src.progress import DEFAULT_PROGRESS
 
 def test_draw_runs():
     g = Game(DEFAULT_PROGRESS.copy())
     draw(g)  # Should not raise
-    assert True  # If we reach here, the test passes
\ No newline at end of file
+    assert True  # If we reach here, the test passes
+def test_draw_only_repaints_changes():
+    g = Game(DEFAULT_PROGRESS.copy())
+    reset_frame()
+    first = io.StringIO()
+    draw(g, first)
+    again = io.StringIO()
+    draw(g, again)
+    assert "\033[2J" in first.getvalue()
+    assert len(again.getvalue()) < len(first.getvalue()) // 10
+    reset_frame()
+    full = io.StringIO()
+    draw(g, full)
+    assert "\033[2J" in full.getvalue()
+def test_tiles_explored_between_frames_show():
+    import copy, random
+    from src.render import FrameRenderer, EXPLORED
+    random.seed(4)
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS))
+    r = FrameRenderer()
+    g.tick()
+    r.frame(g)
+    for _ in range(30):
+        g.tick()
+    r.frame(g)
+    w = g.grid.w
+    assert all(r.explored[y*w + x] >= EXPLORED for (x, y) in g.explored)
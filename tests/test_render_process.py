@@ -0,0 +1,28 @@
+# tests/test_render_process.py
+import copy
+from src.game import Game
+from src.progress import DEFAULT_PROGRESS
+from src.render import FrameRenderer
+from src.render_process import FrameBuffer, GameView, RenderProcess, snapshot
+
+def test_snapshot_renders_like_the_game():
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS))
+    g.tick()
+    view = GameView(snapshot(g))
+    assert FrameRenderer().frame(view) == FrameRenderer().frame(g)
+def test_frame_buffer_keeps_latest_snapshot():
+    fb = FrameBuffer(capacity=64)
+    try:
+        assert fb.read()[1] is None
+        fb.write(b"first")
+        fb.write(b"second")
+        seq, payload = fb.read()
+        assert payload == b"second"
+        assert fb.read(seq) == (seq, None)
+    finally:
+        fb.release()
+def test_render_process_starts_and_stops():
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS))
+    with RenderProcess(fps=100) as rp:
+        rp.publish(g, force=True)
+    assert not rp.proc.is_alive()
@@ -0,0 +1,30 @@
+# tests/test_replay.py
+import copy
+import random
+from src.game import Game
+from src.progress import DEFAULT_PROGRESS
+from src.replay import Recorder, Replay, fingerprint
+
+def test_seek_reproduces_recorded_floor(tmp_path):
+    random.seed(5)
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS))
+    rec = Recorder(tmp_path / "f.replay", seed=5, snapshot_every=20)
+    rec.start(g)
+    seen = {}
+    while not g.is_over() and g.ticks < 300:
+        g.tick()
+        if g.ticks == 7:
+            g.apply_input("p")
+            g.apply_input("3")
+            g.apply_input("p")
+        seen[g.ticks] = fingerprint(g)
+    rec.close(g)
+
+    replay = Replay(tmp_path / "f.replay")
+    assert replay.end_tick == g.ticks
+    assert replay.keys == {7: ["p", "3", "p"]}
+    assert replay.verify() is None
+    for tick in (1, 7, 19, 20, 21, g.ticks):
+        game = replay.seek(tick)
+        assert fingerprint(game) == seen[tick]
+    assert replay.seek(8).speed_mode == "fast"
@@ -0,0 +1,41 @@
+# tests/test_savestate.py
+import copy
+import random
+from src.game import Game
+from src.progress import DEFAULT_PROGRESS
+from src.replay import fingerprint
+from src.savestate import dumps, loads, save_game, load_game, pack_bits, unpack_bits
+
+def test_bits_roundtrip():
+    for n in (1, 8, 13, 1000):
+        idx = sorted({(i * 7) % n for i in range(n // 3 + 1)})
+        assert unpack_bits(pack_bits(idx, n), n) == idx
+    assert pack_bits([], 0) == b""
+
+def test_restored_game_plays_on_identically():
+    random.seed(3)
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS))
+    for _ in range(40):
+        g.tick()
+    data = dumps(g)
+    state = random.getstate()
+    g2 = loads(data)
+    assert fingerprint(g2) == fingerprint(g)
+    assert g2.visible == g.visible and g2.explored == g.explored
+    assert g2.log == g.log and g2.path == g.path
+    a, b = [], []
+    for game, out in ((g, a), (g2, b)):
+        random.setstate(state)  # both play on from the saved global RNG
+        for _ in range(200):
+            game.tick()
+            out.append(fingerprint(game))
+    assert a == b
+
+def test_save_file_is_replaced_atomically(tmp_path):
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS))
+    path = tmp_path / "save.bin"
+    save_game(g, path)
+    save_game(g, path)
+    assert [p.name for p in tmp_path.iterdir()] == ["save.bin"]
+    assert load_game(path).floor == g.floor
+    assert load_game(tmp_path / "missing.bin") is None
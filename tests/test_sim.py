@@ -0,0 +1,27 @@
+# tests/test_sim.py
+import random
+from src.game import Game
+from src.replay import fingerprint
+from src.sim import new_progress, simulate_floor, simulate_run
+
+def test_simulate_floor_result():
+    res = simulate_floor(new_progress())
+    assert res["floor"] == 1
+    assert res["result"] in ("escaped", "dead", "stuck")
+    assert res["ticks"] > 0
+def test_simulate_run_is_reproducible():
+    a = simulate_run(7, max_floors=3)
+    b = simulate_run(7, max_floors=3)
+    assert a == b
+    assert 1 <= len(a["floors"]) <= 3
+def test_skipping_fov_does_not_change_play():
+    out = []
+    for track in (True, False):
+        random.seed(4)
+        g = Game(new_progress())
+        g.instant_combat, g.track_fov = True, track
+        for _ in range(300):
+            g.tick()
+        out.append(fingerprint(g))
+        assert bool(g.visible) == track
+    assert out[0] == out[1]
@@ -0,0 +1,32 @@
+# tests/test_spatial.py
+import random
+from src.dungeon.spatial import SpatialIndex
+
+def test_index_set_and_mapping_api():
+    idx = SpatialIndex([(1, 1), (20, 5)])
+    assert (1, 1) in idx and len(idx) == 2
+    idx.remove((1, 1))
+    assert (1, 1) not in idx
+    idx[(3, 4)] = "monster"
+    assert idx.get((3, 4)) == "monster"
+    idx.move((3, 4), (3, 5))
+    assert dict(idx.items()) == {(20, 5): None, (3, 5): "monster"}
+def test_nearest_matches_brute_force():
+    random.seed(1)
+    pts = {(random.randrange(200), random.randrange(200)) for _ in range(500)}
+    idx = SpatialIndex(pts, cell=8)
+    for _ in range(20):
+        q = (random.randrange(200), random.randrange(200))
+        got = idx.nearest(q, k=5)
+        dists = sorted(abs(p[0]-q[0]) + abs(p[1]-q[1]) for p in pts)[:5]
+        assert [abs(p[0]-q[0]) + abs(p[1]-q[1]) for p in got] == dists
+def test_within_and_rect_queries():
+    idx = SpatialIndex([(5, 5), (8, 5), (30, 30)])
+    assert sorted(idx.within((5, 5), 3)) == [(5, 5), (8, 5)]
+    assert [p for p, _ in idx.in_rect(0, 0, 10, 10)] != []
+    assert sorted(p for p, _ in idx.in_rect(6, 0, 40, 40)) == [(8, 5), (30, 30)]
+def test_nearest_after_removals():
+    idx = SpatialIndex([(0, 0), (100, 100), (50, 40)], cell=8)
+    idx.remove((100, 100))
+    idx.remove((0, 0))
+    assert idx.nearest((90, 90), k=2) == [(50, 40)]
@@ -0,0 +1,25 @@
+# tests/test_store.py
+import json
+from src.store import read_progress, write_progress, RunHistory
+
+def test_progress_roundtrip_and_legacy_import(tmp_path):
+    db = tmp_path / "p.db"
+    legacy = tmp_path / "progress.json"
+    legacy.write_text(json.dumps({"runs": 3, "bank_gold": 7}))
+    assert read_progress(db, legacy=legacy) == {"runs": 3, "bank_gold": 7}
+    assert not legacy.exists()
+    write_progress({"runs": 4}, db)
+    assert read_progress(db, legacy=legacy) == {"runs": 4}
+
+def test_history_batches_and_summarizes(tmp_path):
+    db = tmp_path / "p.db"
+    with RunHistory(db, batch=3, flush_every=1e9, session="s") as h:
+        for i in range(4):
+            h.record({"floor": i + 1, "result": "escaped", "gold": 10, "ticks": 5})
+        assert len(h.pending) == 1  # one batch of 3 written
+        h.record({"floor": 5, "result": "dead", "cause": "boss"})
+    with RunHistory(db) as h:
+        s = h.summary("s")
+    assert s["floors"] == 5 and s["deepest"] == 5
+    assert s["results"] == {"escaped": 4, "dead": 1}
+    assert s["gold"] == 40
@@ -0,0 +1,29 @@
+# tests/test_trace.py
+import copy
+import json
+from src.game import Game
+from src.progress import DEFAULT_PROGRESS
+from src.render import hud_lines
+from src.trace import Histogram, Tracer
+
+def test_histogram_percentiles():
+    h = Histogram()
+    for ns in range(1, 10001):
+        h.add(ns * 1000)
+    assert abs(h.percentile(50) - 5_000_000) / 5_000_000 < 0.07
+    assert abs(h.percentile(99) - 9_900_000) / 9_900_000 < 0.07
+    assert h.percentile(100) <= h.max == 10_000_000
+
+def test_tracer_times_phases_and_exports(tmp_path):
+    g = Game(copy.deepcopy(DEFAULT_PROGRESS))
+    assert "tick" not in vars(g)  # untraced games run the plain methods
+    tracer = Tracer(events=True, overlay=True).attach(g).tracer
+    for _ in range(20):
+        g.tick()
+    stats = tracer.stats()
+    assert stats["tick"]["count"] == 20 and stats["regen"]["count"] == 20
+    assert "Timing p50/p99 ms: tick" in hud_lines(g)[-1]
+    tracer.export(tmp_path / "t.json")
+    events = json.loads((tmp_path / "t.json").read_text())["traceEvents"]
+    assert sum(e["name"] == "tick" for e in events) == 20
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)